@@ -0,0 +1,90 @@
+import os
+import sys
+
+from swsscommon import swsscommon
+from sonic_py_common.general import load_module_from_source
+from unittest import TestCase, mock
+from pyfakefs.fake_filesystem_unittest import patchfs
+
+from tests.common.mock_configdb import MockConfigDb
+
+
+DBCONFIG_PATH = '/var/run/redis/sonic-db/database_config.json'
+
+ACL_CACHE_CONFIG_DB = {
+    "ACL_TABLE": {
+        "SSH_ONLY": {
+            "stage": "ingress",
+            "type": "CTRLPLANE",
+            "services": [
+                "SSH"
+            ]
+        },
+        "DATAACL": {
+            "stage": "ingress",
+            "type": "L3",
+            "ports": [
+                "Ethernet0"
+            ]
+        }
+    },
+    "ACL_RULE": {
+        "SSH_ONLY|RULE_1": {
+            "PACKET_ACTION": "ACCEPT",
+            "PRIORITY": "9999",
+            "SRC_IP": "10.0.0.1/32"
+        }
+    },
+    "DEVICE_METADATA": {
+        "localhost": {
+        }
+    },
+    "FEATURE": {},
+}
+
+
+class TestCaclmgrdAclCache(TestCase):
+    """
+        Test caclmgrd local ACL_TABLE/ACL_RULE mirror
+    """
+    def setUp(self):
+        swsscommon.ConfigDBConnector = MockConfigDb
+        test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        modules_path = os.path.dirname(test_path)
+        scripts_path = os.path.join(modules_path, "scripts")
+        sys.path.insert(0, modules_path)
+        caclmgrd_path = os.path.join(scripts_path, 'caclmgrd')
+        self.caclmgrd = load_module_from_source('caclmgrd', caclmgrd_path)
+
+    @patchfs
+    def test_caclmgrd_acl_cache(self, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        MockConfigDb.set_config_db(ACL_CACHE_CONFIG_DB)
+        self.caclmgrd.ControlPlaneAclManager.get_namespace_mgmt_ip = mock.MagicMock()
+        self.caclmgrd.ControlPlaneAclManager.get_namespace_mgmt_ipv6 = mock.MagicMock()
+        self.caclmgrd.ControlPlaneAclManager.get_chain_list = mock.MagicMock(return_value=["INPUT", "FORWARD", "OUTPUT"])
+        caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+
+        config_db_connector = MockConfigDb()
+        caclmgrd_daemon.init_acl_cache('', config_db_connector)
+
+        # Rule notifications are only relevant if they point to a control plane ACL table
+        self.assertTrue(caclmgrd_daemon.update_acl_cache('', "SSH_ONLY|RULE_2", "SET",
+                        (("PACKET_ACTION", "ACCEPT"), ("PRIORITY", "9998"), ("SRC_IP", "10.0.0.2/32")), "|"))
+        self.assertFalse(caclmgrd_daemon.update_acl_cache('', "DATAACL|RULE_1", "SET",
+                         (("PACKET_ACTION", "DROP"), ("PRIORITY", "9999"), ("SRC_IP", "10.0.0.3/32")), "|"))
+        self.assertTrue(caclmgrd_daemon.update_acl_cache('', "SSH_ONLY|RULE_1", "DEL", (), "|"))
+        self.assertTrue(caclmgrd_daemon.update_acl_cache('', "NTP_ACL", "SET",
+                        (("type", "CTRLPLANE"), ("services@", "NTP"), ("stage", "ingress")), "|"))
+
+        self.assertEqual(caclmgrd_daemon.acl_table_cache['']["NTP_ACL"]["services"], ["NTP"])
+
+        with mock.patch.object(config_db_connector, "get_table", wraps=config_db_connector.get_table) as mock_get_table:
+            iptables_rules_ret, _ = caclmgrd_daemon.get_acl_rules_and_translate_to_iptables_commands('', config_db_connector)
+            for call_args in mock_get_table.call_args_list:
+                self.assertNotIn(call_args[0][0], ["ACL_TABLE", "ACL_RULE"])
+
+        self.assertIn(['iptables', '-A', 'INPUT', '-p', 'tcp', '-s', '10.0.0.2/32', '--dport', '22', '-j', 'ACCEPT'], iptables_rules_ret)
+        self.assertNotIn(['iptables', '-A', 'INPUT', '-p', 'tcp', '-s', '10.0.0.1/32', '--dport', '22', '-j', 'ACCEPT'], iptables_rules_ret)
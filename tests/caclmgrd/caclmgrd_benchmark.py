@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+    caclmgrd translation and apply benchmark
+
+    Generates synthetic CONFIG_DB contents holding a given number of control
+    plane ACL rules spread over several ACL tables and namespaces, and for each
+    scale point measures:
+      - the time taken to translate the ACLs of every namespace into iptables commands
+      - the number of iptables commands generated
+      - the peak memory allocated while translating
+      - the time taken by a full apply and by an incremental apply (one rule changed)
+        with the subprocess layer stubbed out, along with the number of processes
+        that would have been spawned and an estimate of their cost
+
+    Results are emitted as JSON so that they can be compared across commits.
+    Run it from the repository root, e.g.:
+
+        python3 -m tests.caclmgrd.caclmgrd_benchmark --rules 1000 10000 50000 --output caclmgrd_benchmark.json
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import swsscommon
+
+from sonic_py_common.general import load_module_from_source
+from unittest import mock
+
+from tests.common.benchmark import benchmark_main
+from tests.common.mock_configdb import MockConfigDb
+
+DEFAULT_RULE_COUNTS = [1000, 10000, 50000]
+DEFAULT_TABLE_COUNT = 8
+DEFAULT_NAMESPACE_COUNT = 1
+DEFAULT_REPEAT = 3
+# Estimated cost of spawning an iptables/iptables-restore process, used to
+# turn the number of stubbed processes into a simulated apply time
+DEFAULT_SPAWN_COST_MS = 5.0
+
+ACL_SERVICES = ["SSH", "SNMP", "NTP", "EXTERNAL_CLIENT"]
+
+
+class StubPopen(object):
+    """
+        Stand-in for subprocess.Popen which records the commands that would
+        have been spawned instead of running them
+    """
+    spawned = []
+
+    def __init__(self, cmd, **kwargs):
+        self.cmd = cmd
+        self.returncode = 0
+
+    def communicate(self, input=None):
+        StubPopen.spawned.append((self.cmd, len(input) if input else 0))
+        return ("", "")
+
+    @staticmethod
+    def reset():
+        StubPopen.spawned = []
+
+
+def load_caclmgrd():
+    swsscommon.swsscommon.ConfigDBConnector = MockConfigDb
+    modules_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.path.insert(0, modules_path)
+    return load_module_from_source('caclmgrd', os.path.join(modules_path, 'scripts', 'caclmgrd'))
+
+
+def generate_config_db(num_rules, num_tables):
+    """
+    Generate CONFIG_DB contents holding num_rules control plane ACL rules spread
+    evenly over num_tables ACL tables, alternating services and IP versions.
+    """
+    config_db = {
+        "DEVICE_METADATA": {
+            "localhost": {
+            }
+        },
+        "FEATURE": {},
+        "ACL_TABLE": {},
+        "ACL_RULE": {},
+    }
+
+    for table_idx in range(num_tables):
+        service = ACL_SERVICES[table_idx % len(ACL_SERVICES)]
+        is_ipv6 = (table_idx // len(ACL_SERVICES)) % 2 == 1
+        table_name = "{}_ACL_{}".format(service, table_idx)
+        config_db["ACL_TABLE"][table_name] = {
+            "stage": "INGRESS",
+            "type": "CTRLPLANE",
+            "services": [service],
+        }
+
+        table_rule_count = num_rules // num_tables + (1 if table_idx < num_rules % num_tables else 0)
+        for rule_idx in range(table_rule_count):
+            rule_props = {
+                "PACKET_ACTION": "ACCEPT",
+                "PRIORITY": str(table_rule_count - rule_idx),
+            }
+            if is_ipv6:
+                rule_props["SRC_IPV6"] = "2001:db8:{:x}:{:x}::/64".format(table_idx, rule_idx)
+            else:
+                rule_props["SRC_IP"] = "10.{}.{}.{}/32".format(table_idx % 256, (rule_idx // 256) % 256, rule_idx % 256)
+            if service == "EXTERNAL_CLIENT":
+                rule_props["L4_DST_PORT"] = str(8080 + table_idx)
+            config_db["ACL_RULE"]["{}|RULE_{}".format(table_name, rule_idx)] = rule_props
+
+    return config_db
+
+
+def measure_apply(caclmgrd_daemon, namespaces, spawn_cost_ms):
+    StubPopen.reset()
+    start = time.perf_counter()
+    caclmgrd_daemon.update_control_plane_acls_for_namespaces(namespaces)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "time_secs": elapsed,
+        "processes_spawned": len(StubPopen.spawned),
+        "restore_payload_bytes": sum(payload_size for _, payload_size in StubPopen.spawned),
+        "simulated_time_secs": elapsed + len(StubPopen.spawned) * spawn_cost_ms / 1000.0,
+    }
+
+
+def run_benchmark(caclmgrd, num_rules, num_tables, num_namespaces, repeat, spawn_cost_ms):
+    """
+    Benchmark translation and apply of num_rules control plane ACL rules.
+    Returns:
+        A dict holding the measurements of this scale point
+    """
+    MockConfigDb.set_config_db(generate_config_db(num_rules, num_tables))
+    asic_namespaces = ["asic{}".format(idx) for idx in range(num_namespaces - 1)]
+
+    with mock.patch("sonic_py_common.multi_asic.get_all_namespaces",
+                    return_value={'front_ns': asic_namespaces, 'back_ns': [], 'fabric_ns': []}), \
+            mock.patch("caclmgrd.ControlPlaneAclManager.run_commands_pipe", return_value=''), \
+            mock.patch("caclmgrd.subprocess.Popen", StubPopen):
+        caclmgrd_daemon = caclmgrd.ControlPlaneAclManager("caclmgrd")
+        namespaces = list(caclmgrd_daemon.config_db_map.keys())
+        for namespace in namespaces:
+            caclmgrd_daemon.init_acl_cache(namespace, caclmgrd_daemon.config_db_map[namespace])
+
+        def translate():
+            return [caclmgrd_daemon.get_acl_rules_and_translate_to_iptables_commands(namespace, caclmgrd_daemon.config_db_map[namespace])[0]
+                    for namespace in namespaces]
+
+        translation_times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            iptables_cmds = translate()
+            translation_times.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        translate()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        full_apply = measure_apply(caclmgrd_daemon, namespaces, spawn_cost_ms)
+
+        # Change a single rule in every namespace, as a notification would
+        table_name = next(iter(MockConfigDb.CONFIG_DB["ACL_TABLE"]))
+        rule_props = dict(MockConfigDb.CONFIG_DB["ACL_RULE"]["{}|RULE_0".format(table_name)])
+        rule_props["PACKET_ACTION"] = "DROP"
+        for namespace in namespaces:
+            caclmgrd_daemon.update_acl_cache(namespace, "{}|RULE_0".format(table_name), "SET", list(rule_props.items()), "|")
+        incremental_apply = measure_apply(caclmgrd_daemon, namespaces, spawn_cost_ms)
+
+    return {
+        "rules": num_rules,
+        "tables": num_tables,
+        "namespaces": len(namespaces),
+        "translation_time_secs": min(translation_times),
+        "iptables_commands": sum(len(cmds) for cmds in iptables_cmds),
+        "translation_peak_memory_bytes": peak_memory,
+        "full_apply": full_apply,
+        "incremental_apply": incremental_apply,
+    }
+
+
+def run(args):
+    caclmgrd = load_caclmgrd()
+    results = {
+        "benchmark": "caclmgrd",
+        "spawn_cost_ms": args.spawn_cost_ms,
+        "results": [run_benchmark(caclmgrd, num_rules, args.tables, args.namespaces, args.repeat, args.spawn_cost_ms)
+                    for num_rules in args.rules],
+    }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark caclmgrd control plane ACL translation and apply")
+    parser.add_argument("--rules", type=int, nargs="+", default=DEFAULT_RULE_COUNTS,
+                        help="Number of ACL rules of each scale point")
+    parser.add_argument("--tables", type=int, default=DEFAULT_TABLE_COUNT,
+                        help="Number of control plane ACL tables the rules are spread over")
+    parser.add_argument("--namespaces", type=int, default=DEFAULT_NAMESPACE_COUNT,
+                        help="Number of namespaces, including the host namespace")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="Number of translation runs, the fastest one is reported")
+    parser.add_argument("--spawn-cost-ms", type=float, default=DEFAULT_SPAWN_COST_MS,
+                        help="Estimated cost of spawning one process, in milliseconds")
+    return benchmark_main(parser, run, argv)
+
+
+if __name__ == "__main__":
+    main()
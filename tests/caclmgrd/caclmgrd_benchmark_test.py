@@ -0,0 +1,34 @@
+import json
+import os
+import tempfile
+
+from unittest import TestCase
+
+from . import caclmgrd_benchmark
+
+
+class TestCaclmgrdBenchmark(TestCase):
+    """
+        Test the caclmgrd benchmark harness at a small scale
+    """
+    def test_generate_config_db(self):
+        config_db = caclmgrd_benchmark.generate_config_db(1001, 8)
+        self.assertEqual(len(config_db["ACL_TABLE"]), 8)
+        self.assertEqual(len(config_db["ACL_RULE"]), 1001)
+
+    def test_caclmgrd_benchmark(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = os.path.join(tmpdir, "caclmgrd_benchmark.json")
+            caclmgrd_benchmark.main(["--rules", "100", "200", "--namespaces", "2", "--repeat", "1", "--output", output])
+            with open(output) as f:
+                results = json.load(f)
+
+        self.assertEqual([result["rules"] for result in results["results"]], [100, 200])
+        for result in results["results"]:
+            self.assertEqual(result["namespaces"], 2)
+            self.assertGreater(result["iptables_commands"], result["rules"])
+            self.assertGreater(result["translation_peak_memory_bytes"], 0)
+            # The full apply goes through iptables-restore, an unchanged ruleset does not
+            # need a rebuild and a single changed rule is applied as a small delta
+            self.assertGreater(result["full_apply"]["restore_payload_bytes"], result["incremental_apply"]["restore_payload_bytes"])
+            self.assertGreater(result["incremental_apply"]["restore_payload_bytes"], 0)
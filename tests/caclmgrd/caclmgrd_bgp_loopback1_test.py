@@ -46,5 +46,5 @@ class TestCaclmgrdLoopback1Drop(TestCase):
                 mocked_subprocess.call.return_value = call_rc
 
                 caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
-                caclmgrd_daemon.update_control_plane_nat_acls('', {}, MockConfigDb())
+                caclmgrd_daemon.update_control_plane_acls("", MockConfigDb())
                 mocked_subprocess.Popen.assert_has_calls(test_data["expected_subprocess_calls"], any_order=True)
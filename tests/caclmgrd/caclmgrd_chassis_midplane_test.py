@@ -1,4 +1,5 @@
 import os
+import socket
 import sys
 
 from swsscommon import swsscommon
@@ -39,7 +40,7 @@ class TestCaclmgrdChassisMidplane(TestCase):
 
         with mock.patch("sonic_py_common.device_info.is_chassis", mock_is_chassis):
             with mock.patch("sonic_py_common.device_info.is_smartswitch", mock_is_smartswitch):
-                with mock.patch("caclmgrd.ControlPlaneAclManager.run_commands_pipe", side_effect=["eth1-midplane", "1.0.0.33", "eth1-midplane", "1.0.0.33"]):
+                with mock.patch("caclmgrd.psutil.net_if_addrs", return_value={"eth1-midplane": [mock.Mock(family=socket.AF_INET, address="1.0.0.33")]}):
                         caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
                         config_db_connector = caclmgrd_daemon.config_db_map['']
                         ret = caclmgrd_daemon.generate_allow_internal_chasis_midplane_traffic('', config_db_connector)
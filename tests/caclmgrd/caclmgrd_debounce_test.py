@@ -0,0 +1,108 @@
+import os
+import sys
+import threading
+import swsscommon
+
+from parameterized import parameterized
+from sonic_py_common.general import load_module_from_source
+from unittest import TestCase, mock
+
+from tests.common.mock_configdb import MockConfigDb
+
+# Timelines of ACL change notifications, as offsets in seconds from the first one
+SINGLE_EDIT = [0.0]
+FEW_EDITS = [0.0, 0.01, 0.02]
+# 5000 ACL_RULE entries pushed over 2.5 seconds
+BULK_LOAD = [i * 0.0005 for i in range(5000)]
+
+
+class TestCaclmgrdDebounce(TestCase):
+    """
+        Test caclmgrd debounce policies against synthetic ACL change timelines
+    """
+    def setUp(self):
+        swsscommon.swsscommon.ConfigDBConnector = MockConfigDb
+        test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        modules_path = os.path.dirname(test_path)
+        scripts_path = os.path.join(modules_path, "scripts")
+        sys.path.insert(0, modules_path)
+        caclmgrd_path = os.path.join(scripts_path, 'caclmgrd')
+        self.caclmgrd = load_module_from_source('caclmgrd', caclmgrd_path)
+        MockConfigDb.set_config_db({"DEVICE_METADATA": {"localhost": {}}, "FEATURE": {}})
+
+    def replay(self, debounce_policy, timeline):
+        """
+        Run an update thread against a timeline of ACL changes on a simulated clock.
+        Like run(), the first change spawns the update thread and every change bumps
+        num_changes.
+        Returns:
+            The simulated times at which control plane ACLs were updated
+        """
+        manager = self.caclmgrd.ControlPlaneAclManager("caclmgrd", debounce_policy=debounce_policy)
+        manager.lock = {"": threading.Lock()}
+        manager.update_thread = {"": None}
+        manager.num_changes = {"": 1}
+
+        clock = [timeline[0]]
+        pending = list(timeline[1:])
+        update_times = []
+
+        def sleep(secs):
+            clock[0] += secs
+            while pending and pending[0] <= clock[0]:
+                pending.pop(0)
+                manager.num_changes[""] += 1
+
+        with mock.patch("caclmgrd.time.sleep", side_effect=sleep), \
+                mock.patch.object(manager, "update_control_plane_acls", side_effect=lambda *args: update_times.append(clock[0])):
+            manager.check_and_update_control_plane_acls("", 1)
+
+        self.assertFalse(pending)
+        return update_times
+
+    def test_adaptive_policy_is_default(self):
+        manager = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+        self.assertIsInstance(manager.debounce_policy, self.caclmgrd.AdaptiveDebouncePolicy)
+
+    @parameterized.expand([
+        ("single_edit", SINGLE_EDIT, 0.1),
+        ("few_edits", FEW_EDITS, 0.2),
+    ])
+    def test_adaptive_debounce_low_latency(self, test_name, timeline, max_latency):
+        policy = self.caclmgrd.AdaptiveDebouncePolicy(0.05, 2.0)
+        update_times = self.replay(policy, timeline)
+        self.assertEqual(len(update_times), 1)
+        self.assertLess(update_times[0] - timeline[-1], max_latency)
+
+    def test_adaptive_debounce_bulk_load(self):
+        policy = self.caclmgrd.AdaptiveDebouncePolicy(0.05, 2.0)
+        update_times = self.replay(policy, BULK_LOAD)
+        # A single rebuild, at most two maximal windows after the last change: the end
+        # of the window it arrived in, followed by one quiet window
+        self.assertEqual(len(update_times), 1)
+        self.assertLessEqual(update_times[0] - BULK_LOAD[-1], 2 * 2.0)
+
+    def test_adaptive_debounce_window_is_bounded(self):
+        policy = self.caclmgrd.AdaptiveDebouncePolicy(0.05, 2.0)
+        delay = policy.initial_delay()
+        delays = [delay]
+        for _ in range(10):
+            delay = policy.next_delay(delay, 1)
+            delays.append(delay)
+        self.assertEqual(delays[:4], [0.05, 0.1, 0.2, 0.4])
+        self.assertEqual(max(delays), 2.0)
+
+    def test_adaptive_debounce_window_grows_with_changes(self):
+        policy = self.caclmgrd.AdaptiveDebouncePolicy(0.05, 2.0)
+        self.assertAlmostEqual(policy.next_delay(0.05, 1), 0.1)
+        self.assertAlmostEqual(policy.next_delay(0.05, 3), 0.2)
+        # A bulk load reaches the largest window right away
+        self.assertEqual(policy.next_delay(0.05, 1000), 2.0)
+
+    def test_fixed_debounce(self):
+        policy = self.caclmgrd.FixedDebouncePolicy(0.5)
+        update_times = self.replay(policy, SINGLE_EDIT)
+        self.assertEqual(update_times, [0.5])
+
+        update_times = self.replay(policy, BULK_LOAD)
+        self.assertEqual(len(update_times), 1)
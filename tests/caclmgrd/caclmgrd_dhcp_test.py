@@ -40,15 +40,48 @@ class TestCaclmgrdDhcp(TestCase):
                 popen_mock.configure_mock(**popen_attrs)
                 mocked_subprocess.Popen.return_value = popen_mock
 
-                call_rc = test_data["call_rc"]
-                mocked_subprocess.call.return_value = call_rc
+                caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+                for key, mark in test_data["dhcp_packet_mark"].items():
+                    caclmgrd_daemon.update_dhcp_packet_mark(key, mark)
+                for intf, mark in test_data["installed_rules"]:
+                    caclmgrd_daemon.dhcp_blocked_intfs.add(intf)
+                caclmgrd_daemon.dhcp_chain_rules[''] = set(test_data["installed_rules"])
 
-                mark = test_data["mark"]
+                for key, mark in test_data.get("mark_update", []):
+                    caclmgrd_daemon.update_dhcp_packet_mark(key, mark)
+                for key, data in test_data["mux_update"]:
+                    caclmgrd_daemon.update_dhcp_acl(key, '', data)
+                caclmgrd_daemon.apply_dhcp_chain_updates()
 
-                caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
-                mux_update = test_data["mux_update"]
+                # All changes are applied as a single restore transaction, without --check calls
+                mocked_subprocess.call.assert_not_called()
+                self.assertEqual(popen_mock.communicate.call_args_list, test_data["expected_restore_inputs"])
+
+                # Nothing left to apply once the chain is in sync
+                mocked_subprocess.Popen.reset_mock()
+                caclmgrd_daemon.apply_dhcp_chain_updates()
+                mocked_subprocess.Popen.assert_not_called()
+
+    @patchfs
+    def test_caclmgrd_dhcp_rebuild_on_failure(self, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
 
-                for key,data in mux_update:
-                    caclmgrd_daemon.update_dhcp_acl(key, '', data, mark)
+        MockConfigDb.set_config_db(CACLMGRD_DHCP_TEST_VECTOR[0][1]["config_db"])
+
+        with mock.patch("caclmgrd.ControlPlaneAclManager.run_commands_pipe", return_value='DHCP'):
+            with mock.patch("caclmgrd.subprocess") as mocked_subprocess:
+                popen_mock = mock.Mock()
+                popen_mock.configure_mock(**{'communicate.return_value': ('output', 'error'), 'returncode': 1})
+                mocked_subprocess.Popen.return_value = popen_mock
+
+                caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+                caclmgrd_daemon.dhcp_chain_rules[''] = set([("Ethernet4", None)])
+                caclmgrd_daemon.update_dhcp_acl("Ethernet8", '', {"state": "standby"})
+                caclmgrd_daemon.apply_dhcp_chain_updates()
 
-                mocked_subprocess.call.assert_has_calls(test_data["expected_subprocess_calls"], any_order=False)
+                # The failed delta is followed by a flush of the chain and the insertion of every blocked port
+                mocked_subprocess.Popen.assert_any_call(['iptables', '-F', 'DHCP'], universal_newlines=True, stdout=mocked_subprocess.PIPE)
+                mocked_subprocess.Popen.assert_any_call(['iptables', '--insert', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet8', '-j', 'DROP'],
+                                                        universal_newlines=True, stdout=mocked_subprocess.PIPE)
+                self.assertEqual(caclmgrd_daemon.dhcp_chain_rules[''], set([("Ethernet8", None)]))
@@ -1,3 +1,4 @@
+import copy
 import os
 import sys
 
@@ -52,3 +53,29 @@ class TestCaclmgrdExternalClientAcl(TestCase):
         caclmgrd_daemon.namespace_mgmt_ipv6 = 'fd::02'
 
         _ = caclmgrd_daemon.generate_fwd_traffic_from_namespace_to_host_commands('asic0', None)
+
+    @patchfs
+    def test_caclmgrd_external_client_acl_wide_port_range(self, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        test_data = [data for name, data in EXTERNAL_CLIENT_ACL_TEST_VECTOR
+                     if name == "Test IPv4 dst port range + src ip forEXTERNAL_CLIENT_ACL"][0]
+        config_db = copy.deepcopy(test_data["config_db"])
+        config_db["ACL_RULE"]["EXTERNAL_CLIENT_ACL|RULE_1"]["L4_DST_PORT_RANGE"] = "10000-10999"
+        MockConfigDb.set_config_db(config_db)
+        self.caclmgrd.ControlPlaneAclManager.get_namespace_mgmt_ip = mock.MagicMock()
+        self.caclmgrd.ControlPlaneAclManager.get_namespace_mgmt_ipv6 = mock.MagicMock()
+        self.caclmgrd.ControlPlaneAclManager.generate_block_ip2me_traffic_iptables_commands = mock.MagicMock(return_value=[])
+        self.caclmgrd.ControlPlaneAclManager.get_chain_list = mock.MagicMock(return_value=["INPUT", "FORWARD", "OUTPUT"])
+        self.caclmgrd.ControlPlaneAclManager.get_chassis_midplane_interface_ip = mock.MagicMock(return_value='')
+        caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+
+        iptables_rules_ret, _ = caclmgrd_daemon.get_acl_rules_and_translate_to_iptables_commands('', MockConfigDb())
+        range_rules = [rule for rule in iptables_rules_ret if '10000:10999' in rule]
+        self.assertEqual(range_rules, [
+            ['iptables', '-A', 'INPUT', '-p', 'tcp', '-s', '20.0.0.55/32', '--dport', '10000:10999', '-j', 'ACCEPT'],
+            ['iptables', '-A', 'INPUT', '-p', 'tcp', '--dport', '10000:10999', '-j', 'DROP']
+        ])
+        # The ports of the rules are not written back to the service table shared by the namespaces
+        self.assertNotIn("dst_ports", caclmgrd_daemon.ACL_SERVICES["EXTERNAL_CLIENT"])
@@ -0,0 +1,238 @@
+import copy
+import os
+import sys
+
+from swsscommon import swsscommon
+from sonic_py_common.general import load_module_from_source
+from unittest import TestCase, mock
+from pyfakefs.fake_filesystem_unittest import patchfs
+
+from .test_incremental_update_vectors import INCREMENTAL_UPDATE_TEST_VECTOR
+from tests.common.mock_configdb import MockConfigDb
+
+
+DBCONFIG_PATH = '/var/run/redis/sonic-db/database_config.json'
+
+
+def iptables_save_output(ruleset, binary):
+    """
+    Render the iptables-save output of a kernel holding exactly the given ruleset
+    """
+    lines = []
+    for (_, key_binary, table), state in sorted(ruleset.items()):
+        if key_binary != binary:
+            continue
+        lines.append("*{}".format(table))
+        for chain, policy in state["policies"].items():
+            lines.append(":{} {} [0:0]".format(chain, policy))
+        for chain, rules in state["chains"].items():
+            if chain not in state["policies"]:
+                lines.append(":{} - [0:0]".format(chain))
+            lines += ["-A {} {}".format(chain, ' '.join(rule)) for rule in rules]
+        lines.append("COMMIT")
+    return '\n'.join(lines) + '\n'
+
+
+class TestCaclmgrdFingerprint(TestCase):
+    """
+        Test caclmgrd skipping of unchanged control plane ACLs and verification of installed ones
+    """
+    def setUp(self):
+        swsscommon.ConfigDBConnector = MockConfigDb
+        test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        modules_path = os.path.dirname(test_path)
+        scripts_path = os.path.join(modules_path, "scripts")
+        sys.path.insert(0, modules_path)
+        caclmgrd_path = os.path.join(scripts_path, 'caclmgrd')
+        self.caclmgrd = load_module_from_source('caclmgrd', caclmgrd_path)
+
+    @patchfs
+    def test_caclmgrd_unchanged_acls_are_skipped(self, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        test_data = INCREMENTAL_UPDATE_TEST_VECTOR[0][1]
+        MockConfigDb.set_config_db(copy.deepcopy(test_data["config_db"]))
+
+        with mock.patch("caclmgrd.ControlPlaneAclManager.run_commands_pipe", return_value='sonic') as mock_run_commands_pipe, \
+             mock.patch("caclmgrd.subprocess") as mocked_subprocess:
+            popen_mock = mock.Mock()
+            popen_mock.configure_mock(**{'communicate.return_value': ('output', 'error'), 'returncode': 0})
+            mocked_subprocess.Popen.return_value = popen_mock
+            mocked_subprocess.PIPE = -1
+
+            caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+            caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+            self.assertIn('', caclmgrd_daemon.applied_fingerprint)
+
+            # Identical input runs no process at all
+            for _ in range(3):
+                mocked_subprocess.Popen.reset_mock()
+                mock_run_commands_pipe.reset_mock()
+                caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+                mocked_subprocess.Popen.assert_not_called()
+                mock_run_commands_pipe.assert_not_called()
+
+            # Changed input is applied
+            MockConfigDb.mod_config_db({"ACL_RULE": test_data["acl_rule_update"]})
+            caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+            restore_inputs = [c[1]["input"] for c in popen_mock.communicate.call_args_list]
+            self.assertEqual(restore_inputs, [test_data["expected_restore_calls"][0][1]])
+
+            # An invalidated ruleset is rebuilt even though the input did not change
+            caclmgrd_daemon.invalidate_applied_ruleset('')
+            mocked_subprocess.Popen.reset_mock()
+            caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+            mocked_subprocess.Popen.assert_called()
+
+    @patchfs
+    def test_caclmgrd_verify_installed_rulesets(self, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        MockConfigDb.set_config_db(copy.deepcopy(INCREMENTAL_UPDATE_TEST_VECTOR[0][1]["config_db"]))
+
+        with mock.patch("caclmgrd.ControlPlaneAclManager.run_commands_pipe", return_value='sonic'), \
+             mock.patch("caclmgrd.subprocess") as mocked_subprocess:
+            popen_mock = mock.Mock()
+            popen_mock.configure_mock(**{'communicate.return_value': ('output', 'error'), 'returncode': 0})
+            mocked_subprocess.Popen.return_value = popen_mock
+            mocked_subprocess.PIPE = -1
+
+            caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+            caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+
+        ruleset = caclmgrd_daemon.applied_ruleset['']
+        installed = {binary: iptables_save_output(ruleset, binary) for binary in ["iptables", "ip6tables"]}
+        # Chains managed by others are ignored
+        installed["iptables"] = installed["iptables"].replace("COMMIT", ":DHCP - [0:0]\n-A DHCP -j RETURN\nCOMMIT", 1)
+
+        def run_commands_pipe(cmd):
+            return installed[cmd[-1][:-len("-save")]]
+
+        # Rules read back with different counts are not recorded
+        self.assertNotIn('', caclmgrd_daemon.installed_fingerprint)
+        with mock.patch.object(caclmgrd_daemon, "run_commands_pipe", return_value='sonic'):
+            self.assertEqual(caclmgrd_daemon.verify_installed_rulesets(), [''])
+        self.assertNotIn('', caclmgrd_daemon.applied_ruleset)
+
+        with mock.patch.object(caclmgrd_daemon, "run_commands_pipe", side_effect=run_commands_pipe) as mock_run_commands_pipe, \
+             mock.patch.object(caclmgrd_daemon, "get_chain_list", return_value=["INPUT", "FORWARD", "OUTPUT"]), \
+             mock.patch("caclmgrd.subprocess") as mocked_subprocess:
+            mocked_subprocess.Popen.return_value = popen_mock
+            mocked_subprocess.PIPE = -1
+
+            # The rules are read back right after they are installed
+            caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+            self.assertEqual(sorted(c[0][0] for c in mock_run_commands_pipe.call_args_list),
+                             [['ip6tables-save'], ['iptables-save']])
+            self.assertIn('', caclmgrd_daemon.applied_fingerprint)
+            self.assertIn('', caclmgrd_daemon.installed_fingerprint)
+
+        with mock.patch.object(caclmgrd_daemon, "run_commands_pipe", side_effect=run_commands_pipe) as mock_run_commands_pipe:
+            self.assertEqual(caclmgrd_daemon.verify_installed_rulesets(), [])
+            self.assertEqual(caclmgrd_daemon.verify_installed_rulesets(), [])
+
+            # Someone replaced a rule, the rule counts are unchanged
+            saved_installed = installed["iptables"]
+            installed["iptables"] = installed["iptables"].replace("10.0.0.1/32", "10.0.0.9/32")
+            self.assertNotEqual(installed["iptables"], saved_installed)
+            self.assertEqual(caclmgrd_daemon.verify_installed_rulesets(), [''])
+            self.assertNotIn('', caclmgrd_daemon.applied_ruleset)
+            self.assertNotIn('', caclmgrd_daemon.installed_fingerprint)
+
+        installed["iptables"] = saved_installed
+        caclmgrd_daemon.applied_ruleset[''] = ruleset
+        with mock.patch.object(caclmgrd_daemon, "run_commands_pipe", side_effect=run_commands_pipe):
+            caclmgrd_daemon.record_installed_fingerprint('')
+
+        with mock.patch.object(caclmgrd_daemon, "run_commands_pipe", side_effect=run_commands_pipe) as mock_run_commands_pipe:
+            self.assertEqual(caclmgrd_daemon.verify_installed_rulesets(), [])
+
+            # Someone flushed INPUT
+            installed["iptables"] = '\n'.join(line for line in installed["iptables"].splitlines()
+                                              if not line.startswith("-A INPUT")) + '\n'
+            self.assertEqual(caclmgrd_daemon.verify_installed_rulesets(), [''])
+            self.assertNotIn('', caclmgrd_daemon.applied_ruleset)
+            self.assertNotIn('', caclmgrd_daemon.applied_fingerprint)
+
+            # Nothing is verified until the ruleset is installed again
+            mock_run_commands_pipe.reset_mock()
+            self.assertEqual(caclmgrd_daemon.verify_installed_rulesets(), [])
+            mock_run_commands_pipe.assert_not_called()
+
+    @patchfs
+    def test_caclmgrd_full_rebuild_lists_chains(self, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        MockConfigDb.set_config_db(copy.deepcopy(INCREMENTAL_UPDATE_TEST_VECTOR[0][1]["config_db"]))
+
+        with mock.patch("caclmgrd.ControlPlaneAclManager.run_commands_pipe", return_value='sonic'), \
+             mock.patch("caclmgrd.ControlPlaneAclManager.get_chain_list", return_value=["INPUT", "FORWARD", "OUTPUT"]) as mock_get_chain_list, \
+             mock.patch("caclmgrd.subprocess") as mocked_subprocess:
+            popen_mock = mock.Mock()
+            popen_mock.configure_mock(**{'communicate.return_value': ('output', 'error'), 'returncode': 0})
+            mocked_subprocess.Popen.return_value = popen_mock
+            mocked_subprocess.PIPE = -1
+
+            caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+            caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+            mock_get_chain_list.assert_called_once()
+
+            # Incremental updates do not list the chains
+            mock_get_chain_list.reset_mock()
+            MockConfigDb.mod_config_db({"ACL_RULE": INCREMENTAL_UPDATE_TEST_VECTOR[0][1]["acl_rule_update"]})
+            caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+            mock_get_chain_list.assert_not_called()
+
+            # A full rebuild flushes the chains created by others since the ruleset was installed
+            mock_get_chain_list.return_value = ["INPUT", "FORWARD", "OUTPUT", "STALE"]
+            MockConfigDb.set_config_db(copy.deepcopy(INCREMENTAL_UPDATE_TEST_VECTOR[0][1]["config_db"]))
+            popen_mock.communicate.reset_mock()
+            with mock.patch.object(caclmgrd_daemon, "get_iptables_ruleset_delta", return_value=None):
+                caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+            mock_get_chain_list.assert_called_once()
+            payload = popen_mock.communicate.call_args_list[0][1]["input"]
+            self.assertIn("-F STALE\n", payload)
+            self.assertIn("-X STALE\n", payload)
+
+    @patchfs
+    def test_caclmgrd_full_rebuild_models_applied_commands(self, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        test_data = INCREMENTAL_UPDATE_TEST_VECTOR[0][1]
+        MockConfigDb.set_config_db(copy.deepcopy(test_data["config_db"]))
+
+        def update_config_db(*args):
+            # Config DB changes between the two translations of a full rebuild
+            MockConfigDb.mod_config_db({"ACL_RULE": test_data["acl_rule_update"]})
+            return ["INPUT", "FORWARD", "OUTPUT"]
+
+        with mock.patch("caclmgrd.ControlPlaneAclManager.run_commands_pipe", return_value='sonic'), \
+             mock.patch("caclmgrd.subprocess") as mocked_subprocess:
+            popen_mock = mock.Mock()
+            popen_mock.configure_mock(**{'communicate.return_value': ('output', 'error'), 'returncode': 0})
+            mocked_subprocess.Popen.return_value = popen_mock
+            mocked_subprocess.PIPE = -1
+
+            caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+            with mock.patch.object(caclmgrd_daemon, "get_chain_list", return_value=["INPUT", "FORWARD", "OUTPUT"]):
+                caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+
+            # Rebuild the same rules, which are read again with the chains listed
+            caclmgrd_daemon.applied_fingerprint.clear()
+            with mock.patch.object(caclmgrd_daemon, "get_chain_list", side_effect=update_config_db), \
+                 mock.patch.object(caclmgrd_daemon, "get_iptables_ruleset_delta", return_value=None):
+                caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+
+            # The installed ruleset and its fingerprint are those of the updated rules
+            applied_ruleset = caclmgrd_daemon.applied_ruleset['']
+            applied_fingerprint = caclmgrd_daemon.applied_fingerprint['']
+            caclmgrd_daemon.applied_ruleset.clear()
+            caclmgrd_daemon.applied_fingerprint.clear()
+            with mock.patch.object(caclmgrd_daemon, "get_chain_list", return_value=["INPUT", "FORWARD", "OUTPUT"]):
+                caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+            self.assertEqual(applied_ruleset, caclmgrd_daemon.applied_ruleset[''])
+            self.assertEqual(applied_fingerprint, caclmgrd_daemon.applied_fingerprint[''])
@@ -0,0 +1,105 @@
+import os
+import sys
+
+from swsscommon import swsscommon
+from parameterized import parameterized
+from sonic_py_common.general import load_module_from_source
+from unittest import TestCase, mock
+from pyfakefs.fake_filesystem_unittest import patchfs
+
+from .test_incremental_update_vectors import INCREMENTAL_UPDATE_TEST_VECTOR
+from tests.common.mock_configdb import MockConfigDb
+
+
+DBCONFIG_PATH = '/var/run/redis/sonic-db/database_config.json'
+
+
+class TestCaclmgrdIncrementalUpdate(TestCase):
+    """
+        Test caclmgrd incremental control plane ACL updates
+    """
+    def setUp(self):
+        swsscommon.ConfigDBConnector = MockConfigDb
+        test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        modules_path = os.path.dirname(test_path)
+        scripts_path = os.path.join(modules_path, "scripts")
+        sys.path.insert(0, modules_path)
+        caclmgrd_path = os.path.join(scripts_path, 'caclmgrd')
+        self.caclmgrd = load_module_from_source('caclmgrd', caclmgrd_path)
+
+    @parameterized.expand(INCREMENTAL_UPDATE_TEST_VECTOR)
+    @patchfs
+    def test_caclmgrd_incremental_update(self, test_name, test_data, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        MockConfigDb.set_config_db(test_data["config_db"])
+
+        with mock.patch("caclmgrd.ControlPlaneAclManager.run_commands_pipe", return_value='sonic'), \
+             mock.patch("caclmgrd.ControlPlaneAclManager.get_chain_list", return_value=["INPUT", "FORWARD", "OUTPUT"]), \
+             mock.patch("caclmgrd.subprocess") as mocked_subprocess:
+            popen_mock = mock.Mock()
+            popen_mock.configure_mock(**{'communicate.return_value': ('output', 'error'), 'returncode': 0})
+            mocked_subprocess.Popen.return_value = popen_mock
+            mocked_subprocess.PIPE = -1
+
+            caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+            caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+            self.assertIn('', caclmgrd_daemon.applied_ruleset)
+
+            MockConfigDb.mod_config_db({"ACL_RULE": test_data["acl_rule_update"]})
+            mocked_subprocess.Popen.reset_mock()
+            popen_mock.communicate.reset_mock()
+            caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+
+            restore_calls = [(c[0][0], communicate_call[1]["input"]) for c, communicate_call in
+                             zip(mocked_subprocess.Popen.call_args_list, popen_mock.communicate.call_args_list)]
+            self.assertEqual(restore_calls, test_data["expected_restore_calls"])
+
+    @patchfs
+    def test_caclmgrd_incremental_update_after_out_of_band_change(self, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        MockConfigDb.set_config_db(INCREMENTAL_UPDATE_TEST_VECTOR[0][1]["config_db"])
+
+        with mock.patch("caclmgrd.ControlPlaneAclManager.run_commands_pipe", return_value='sonic'), \
+             mock.patch("caclmgrd.ControlPlaneAclManager.get_chain_list", return_value=["INPUT", "FORWARD", "OUTPUT"]), \
+             mock.patch("caclmgrd.subprocess") as mocked_subprocess:
+            popen_mock = mock.Mock()
+            popen_mock.configure_mock(**{'communicate.return_value': ('output', 'error'), 'returncode': 0})
+            mocked_subprocess.Popen.return_value = popen_mock
+            mocked_subprocess.PIPE = -1
+
+            caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+            caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+            caclmgrd_daemon.add_dash_ha_rules('', '23606')
+            self.assertNotIn('', caclmgrd_daemon.applied_ruleset)
+
+            # The next update has to flush and rebuild the chains
+            popen_mock.communicate.reset_mock()
+            caclmgrd_daemon.update_control_plane_acls('', MockConfigDb())
+            payload = popen_mock.communicate.call_args_list[0][1]["input"]
+            self.assertIn("-F INPUT\n", payload)
+
+    def test_caclmgrd_ruleset_delta(self):
+        caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+        key = ((), "iptables", "filter")
+        accept_ssh = ("-p", "tcp", "--dport", "22", "-j", "ACCEPT")
+        accept_ntp = ("-p", "udp", "--dport", "123", "-j", "ACCEPT")
+        drop = ("-j", "DROP")
+
+        def ruleset(*rules):
+            return {key: {"policies": {}, "chains": {"INPUT": list(rules)}}}
+
+        # Rules are deleted by spec, and inserted at their final position
+        self.assertEqual(
+            caclmgrd_daemon.get_iptables_ruleset_delta(ruleset(accept_ssh, accept_ntp, drop),
+                                                        ruleset(accept_ntp, accept_ssh, drop)),
+            [["iptables", "-D", "INPUT"] + list(accept_ntp),
+             ["iptables", "-I", "INPUT", "1"] + list(accept_ntp)])
+
+        # Deleting one of identical rules by spec may delete the kept one
+        self.assertIsNone(
+            caclmgrd_daemon.get_iptables_ruleset_delta(ruleset(accept_ssh, accept_ntp, accept_ssh, drop),
+                                                        ruleset(accept_ssh, accept_ntp, drop)))
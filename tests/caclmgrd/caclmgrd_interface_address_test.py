@@ -0,0 +1,145 @@
+import errno
+import os
+import socket
+import sys
+
+from swsscommon import swsscommon
+from sonic_py_common.general import load_module_from_source
+from unittest import TestCase, mock
+from pyfakefs.fake_filesystem_unittest import patchfs
+
+from tests.common.mock_configdb import MockConfigDb
+
+
+DBCONFIG_PATH = '/var/run/redis/sonic-db/database_config.json'
+
+HOST_INTERFACE_ADDRESSES = {
+    "docker0": [
+        mock.Mock(family=socket.AF_PACKET, address="02:42:9a:56:2e:a1"),
+        mock.Mock(family=socket.AF_INET, address="240.127.1.1"),
+        mock.Mock(family=socket.AF_INET6, address="fe80::42:9aff:fe56:2ea1%docker0"),
+        mock.Mock(family=socket.AF_INET6, address="fd00::1"),
+    ]
+}
+
+NAMESPACE_IP_ADDR_OUTPUT = (
+    "1: eth0    inet 240.127.1.2/24 brd 240.127.1.255 scope global eth0\\       valid_lft forever preferred_lft forever\n"
+    "1: eth0    inet6 fe80::42:f0ff:fe7f:102/64 scope link \\       valid_lft forever preferred_lft forever\n"
+    "1: eth0    inet6 fd00::2/80 scope global nodad \\       valid_lft forever preferred_lft forever"
+)
+
+
+class TestCaclmgrdInterfaceAddress(TestCase):
+    """
+        Test caclmgrd interface address lookups
+    """
+    def setUp(self):
+        swsscommon.ConfigDBConnector = MockConfigDb
+        test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        modules_path = os.path.dirname(test_path)
+        scripts_path = os.path.join(modules_path, "scripts")
+        sys.path.insert(0, modules_path)
+        caclmgrd_path = os.path.join(scripts_path, 'caclmgrd')
+        self.caclmgrd = load_module_from_source('caclmgrd', caclmgrd_path)
+        MockConfigDb.set_config_db({"DEVICE_METADATA": {"localhost": {}}, "FEATURE": {}})
+
+    @patchfs
+    def test_caclmgrd_host_mgmt_ip(self, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        with mock.patch("caclmgrd.psutil.net_if_addrs", return_value=HOST_INTERFACE_ADDRESSES) as mock_net_if_addrs:
+            caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+            self.assertEqual(caclmgrd_daemon.namespace_mgmt_ip, "240.127.1.1")
+            self.assertEqual(caclmgrd_daemon.namespace_mgmt_ipv6, "fd00::1")
+
+            # Without the address monitor, nothing is cached
+            mock_net_if_addrs.reset_mock()
+            caclmgrd_daemon.get_namespace_mgmt_ip([], '')
+            caclmgrd_daemon.get_namespace_mgmt_ip([], '')
+            self.assertEqual(mock_net_if_addrs.call_count, 2)
+
+    @patchfs
+    def test_caclmgrd_namespace_mgmt_ip(self, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+        ns_prefix = ['ip', 'netns', 'exec', 'asic0']
+        with mock.patch("caclmgrd.ControlPlaneAclManager.run_commands_pipe", return_value=NAMESPACE_IP_ADDR_OUTPUT) as mock_run_commands_pipe:
+            self.assertEqual(caclmgrd_daemon.get_namespace_mgmt_ip(ns_prefix, 'asic0'), "240.127.1.2")
+            self.assertEqual(caclmgrd_daemon.get_namespace_mgmt_ipv6(ns_prefix, 'asic0'), "fd00::2")
+            mock_run_commands_pipe.assert_called_with(ns_prefix + ['ip', '-o', 'addr', 'show', 'eth0'])
+
+    @patchfs
+    def test_caclmgrd_address_monitor(self, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+        with mock.patch("caclmgrd.psutil.net_if_addrs", return_value=HOST_INTERFACE_ADDRESSES) as mock_net_if_addrs, \
+             mock.patch("caclmgrd.socket.socket") as mock_socket:
+            lookups_between_events = []
+
+            def recv(bufsize):
+                # Look the address up twice between two netlink notifications
+                mock_net_if_addrs.reset_mock()
+                caclmgrd_daemon.get_chassis_midplane_interface_ip()
+                caclmgrd_daemon.get_namespace_mgmt_ip([], '')
+                caclmgrd_daemon.get_namespace_mgmt_ipv6([], '')
+                lookups_between_events.append(mock_net_if_addrs.call_count)
+                if len(lookups_between_events) == 3:
+                    raise KeyboardInterrupt
+                return b'RTM_NEWADDR'
+
+            mock_socket.return_value.recv.side_effect = recv
+            with self.assertRaises(KeyboardInterrupt):
+                caclmgrd_daemon.monitor_address_changes()
+
+            mock_socket.return_value.bind.assert_called_once_with((0, 0x110))
+            # Each interface is read once, then served from the cache until the next notification
+            self.assertEqual(lookups_between_events, [2, 2, 2])
+
+    @patchfs
+    def test_caclmgrd_address_change_during_lookup(self, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+        caclmgrd_daemon.address_monitor_running = True
+
+        def net_if_addrs():
+            # The address changes while it is read
+            if mock_net_if_addrs.call_count == 1:
+                with caclmgrd_daemon.host_interface_addr_lock:
+                    caclmgrd_daemon.invalidate_host_interface_addresses()
+            return HOST_INTERFACE_ADDRESSES
+
+        with mock.patch("caclmgrd.psutil.net_if_addrs", side_effect=net_if_addrs) as mock_net_if_addrs:
+            caclmgrd_daemon.get_namespace_mgmt_ip([], '')
+            # The addresses read before the change are not cached
+            self.assertEqual(caclmgrd_daemon.host_interface_addr_cache, {})
+            caclmgrd_daemon.get_namespace_mgmt_ip([], '')
+            caclmgrd_daemon.get_namespace_mgmt_ip([], '')
+            self.assertEqual(mock_net_if_addrs.call_count, 2)
+
+    @patchfs
+    def test_caclmgrd_address_monitor_error(self, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+        with mock.patch("caclmgrd.socket.socket") as mock_socket, \
+             mock.patch.object(caclmgrd_daemon, "log_warning") as mock_log_warning, \
+             mock.patch.object(caclmgrd_daemon, "log_error") as mock_log_error:
+            mock_socket.return_value.recv.side_effect = [b'RTM_NEWADDR', OSError(errno.ENOBUFS, "No buffer space"),
+                                                         OSError(errno.EBADF, "Bad file descriptor"), b'RTM_NEWADDR']
+            caclmgrd_daemon.monitor_address_changes()
+
+            # Lost notifications are only logged, other errors stop the monitor
+            self.assertEqual(mock_socket.return_value.recv.call_count, 3)
+            mock_log_warning.assert_called_once()
+            mock_log_error.assert_called_once()
+            mock_socket.return_value.close.assert_called_once()
+        self.assertFalse(caclmgrd_daemon.address_monitor_running)
+        self.assertEqual(caclmgrd_daemon.host_interface_addr_cache, {})
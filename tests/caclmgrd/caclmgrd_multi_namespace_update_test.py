@@ -0,0 +1,66 @@
+import os
+import sys
+import threading
+import time
+
+from swsscommon import swsscommon
+from sonic_py_common.general import load_module_from_source
+from unittest import TestCase, mock
+from pyfakefs.fake_filesystem_unittest import patchfs
+
+from tests.common.mock_configdb import MockConfigDb
+
+
+DBCONFIG_PATH = '/var/run/redis/sonic-db/database_config.json'
+
+
+class TestCaclmgrdMultiNamespaceUpdate(TestCase):
+    """
+        Test caclmgrd programming several namespaces concurrently
+    """
+    def setUp(self):
+        swsscommon.ConfigDBConnector = MockConfigDb
+        test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        modules_path = os.path.dirname(test_path)
+        scripts_path = os.path.join(modules_path, "scripts")
+        sys.path.insert(0, modules_path)
+        caclmgrd_path = os.path.join(scripts_path, 'caclmgrd')
+        self.caclmgrd = load_module_from_source('caclmgrd', caclmgrd_path)
+
+    @patchfs
+    def test_caclmgrd_multi_namespace_update(self, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        MockConfigDb.set_config_db({"DEVICE_METADATA": {"localhost": {}}, "FEATURE": {}})
+        self.caclmgrd.ControlPlaneAclManager.get_namespace_mgmt_ip = mock.MagicMock(return_value='')
+        self.caclmgrd.ControlPlaneAclManager.get_namespace_mgmt_ipv6 = mock.MagicMock(return_value='')
+        front_ns = ['asic0', 'asic1', 'asic2', 'asic3', 'asic4', 'asic5']
+        with mock.patch('sonic_py_common.multi_asic.get_all_namespaces',
+                        return_value={'front_ns': front_ns, 'back_ns': [], 'fabric_ns': []}):
+            caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+
+        caclmgrd_daemon.MAX_NAMESPACE_WORKERS = 4
+        running = set()
+        max_running = [0]
+        updated = []
+        running_lock = threading.Lock()
+
+        def fake_update(namespace, config_db_connector):
+            # The namespace lock is held while its ACLs are programmed
+            self.assertTrue(caclmgrd_daemon.lock[namespace].locked())
+            with running_lock:
+                running.add(namespace)
+                max_running[0] = max(max_running[0], len(running))
+            time.sleep(0.1)
+            with running_lock:
+                running.discard(namespace)
+                updated.append(namespace)
+
+        caclmgrd_daemon.update_control_plane_acls = fake_update
+        namespaces = list(caclmgrd_daemon.config_db_map.keys())
+        caclmgrd_daemon.update_control_plane_acls_for_namespaces(namespaces)
+
+        self.assertEqual(sorted(updated), sorted([''] + front_ns))
+        self.assertGreater(max_running[0], 1)
+        self.assertLessEqual(max_running[0], 4)
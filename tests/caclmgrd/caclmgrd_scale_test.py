@@ -49,3 +49,84 @@ class TestCaclmgrdScale(TestCase):
                 caclmgrd_daemon.num_changes[''] = 150
                 caclmgrd_daemon.check_and_update_control_plane_acls('', 150)
                 mocked_subprocess.Popen.assert_has_calls(test_data["expected_subprocess_calls"], any_order=True)
+
+    @parameterized.expand(CACLMGRD_SCALE_TEST_VECTOR)
+    @patchfs
+    def test_caclmgrd_scale_restore(self, test_name, test_data, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+
+        MockConfigDb.set_config_db(test_data["config_db"])
+
+        with mock.patch("caclmgrd.ControlPlaneAclManager.run_commands_pipe", return_value='sonic'):
+            with mock.patch("caclmgrd.subprocess") as mocked_subprocess:
+                popen_mock = mock.Mock()
+                popen_attrs = test_data["popen_attributes"]
+                popen_mock.configure_mock(**popen_attrs)
+                popen_mock.returncode = 0
+                mocked_subprocess.Popen.return_value = popen_mock
+                mocked_subprocess.PIPE = -1
+
+                caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+                caclmgrd_daemon.num_changes[''] = 150
+                caclmgrd_daemon.check_and_update_control_plane_acls('', 150)
+
+                # The whole ruleset is applied by one restore transaction per IP version
+                restore_calls = [c for c in mocked_subprocess.Popen.call_args_list if c[0][0][-1] == "--noflush"]
+                self.assertEqual([c[0][0] for c in restore_calls],
+                                 [['iptables-restore', '--noflush'], ['ip6tables-restore', '--noflush']])
+
+                payloads = {}
+                for restore_call, communicate_call in zip(restore_calls, popen_mock.communicate.call_args_list):
+                    payloads[restore_call[0][0][0]] = communicate_call[1]["input"]
+
+                for expected_call in test_data["expected_subprocess_calls"]:
+                    cmd = expected_call[1][0]
+                    _, binary, table, line, _ = caclmgrd_daemon.iptables_cmd_to_restore_line(cmd)
+                    payload = payloads[caclmgrd_daemon.IPTABLES_RESTORE_CMDS[binary]]
+                    self.assertIn("*{}\n".format(table), payload)
+                    self.assertIn(line + "\n", payload)
+
+    @parameterized.expand(CACLMGRD_SCALE_TEST_VECTOR)
+    @patchfs
+    def test_caclmgrd_scale_log_volume(self, test_name, test_data, fs):
+        if not os.path.exists(DBCONFIG_PATH):
+            fs.create_file(DBCONFIG_PATH) # fake database_config.json
+        fs.create_dir(os.path.dirname(self.caclmgrd.ControlPlaneAclManager.COMMAND_DUMP_FILE))
+
+        MockConfigDb.set_config_db(test_data["config_db"])
+
+        with mock.patch("caclmgrd.ControlPlaneAclManager.run_commands_pipe", return_value='sonic'):
+            with mock.patch("caclmgrd.subprocess") as mocked_subprocess:
+                popen_mock = mock.Mock()
+                popen_attrs = test_data["popen_attributes"]
+                popen_mock.configure_mock(**popen_attrs)
+                popen_mock.returncode = 0
+                mocked_subprocess.Popen.return_value = popen_mock
+                mocked_subprocess.PIPE = -1
+
+                caclmgrd_daemon = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+                with mock.patch.object(caclmgrd_daemon, "log_info") as mock_log_info, \
+                        mock.patch.object(caclmgrd_daemon, "log_notice") as mock_log_notice:
+                    caclmgrd_daemon.update_control_plane_acls('', caclmgrd_daemon.config_db_map[''])
+
+                    # Syslog gets one summary instead of one line per command
+                    self.assertLess(mock_log_info.call_count, 10)
+                    mock_log_notice.assert_called_once()
+                    summary = mock_log_notice.call_args[0][0]
+                    self.assertIn("full update", summary)
+                    self.assertIn("ACL rules per service: NTP=50, SNMP=100, SSH=50", summary)
+                    self.assertIn("ruleset hash", summary)
+
+                # Full dumps go to the command dump file once enabled
+                caclmgrd_daemon.invalidate_applied_ruleset('')
+                caclmgrd_daemon.set_command_dump(True)
+                caclmgrd_daemon.update_control_plane_acls('', caclmgrd_daemon.config_db_map[''])
+                caclmgrd_daemon.set_command_dump(False)
+                for handler in caclmgrd_daemon.command_dump_logger.handlers:
+                    handler.flush()
+
+                with open(caclmgrd_daemon.COMMAND_DUMP_FILE) as f:
+                    dump = f.read()
+                for expected_call in test_data["expected_subprocess_calls"]:
+                    self.assertIn(' '.join(expected_call[1][0]), dump)
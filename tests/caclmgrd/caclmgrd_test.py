@@ -7,11 +7,53 @@ from tests.common.mock_configdb import MockConfigDb
 from sonic_py_common.general import load_module_from_source
 import threading
 import sys
+import time
 
 
 DBCONFIG_PATH = "/var/run/redis/sonic-db/database_config.json"
 
 
+class FakeSelectableEvent(object):
+    def __init__(self):
+        self.event = threading.Event()
+
+    def notify(self):
+        self.event.set()
+
+    def getFd(self):
+        return -1
+
+
+class FakeSelect(object):
+    """
+        Select which blocks until its selectable event is notified
+    """
+    OBJECT = 0
+    TIMEOUT = 2
+
+    def __init__(self):
+        self.selectables = []
+        self.timeouts = []
+        self.on_first_select = None
+
+    def addSelectable(self, selectable):
+        self.selectables.append(selectable)
+
+    def removeSelectable(self, selectable):
+        self.selectables.remove(selectable)
+
+    def select(self, timeout, interrupt_on_signal=False):
+        self.timeouts.append(timeout)
+        if self.on_first_select:
+            self.on_first_select()
+            self.on_first_select = None
+        event = next(s for s in self.selectables if isinstance(s, FakeSelectableEvent))
+        if not event.event.wait(5):
+            return (self.TIMEOUT, None)
+        event.event.clear()
+        return (self.OBJECT, event)
+
+
 class TestCaclmgrd(TestCase):
     def setUp(self):
         swsscommon.swsscommon.ConfigDBConnector = MockConfigDb
@@ -54,7 +96,7 @@ class TestCaclmgrd(TestCase):
         mock_update.side_effect = Exception("Test exception")
         # Mock the necessary attributes and methods
         manager = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
-        manager.UPDATE_DELAY_SECS = 1
+        manager.debounce_policy = self.caclmgrd.FixedDebouncePolicy(1)
         manager.lock = {"": threading.Lock()}
         manager.num_changes = {"": 0}
         manager.update_thread = {"": None}
@@ -68,6 +110,56 @@ class TestCaclmgrd(TestCase):
         self.assertIn("Traceback (most recent call last):", exc_info[0])
         self.assertIn("Test exception", exc_info[-1])
 
+    @patch("caclmgrd.ControlPlaneAclManager.update_control_plane_acls")
+    def test_update_thread_reuses_config_db_connector(self, mock_update):
+        MockConfigDb.set_config_db({"DEVICE_METADATA": {"localhost": {}}, "FEATURE": {}})
+        manager = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+        manager.debounce_policy = self.caclmgrd.FixedDebouncePolicy(0)
+        manager.lock = {"": threading.Lock()}
+        manager.update_thread = {"": None}
+        with patch("caclmgrd.swsscommon.ConfigDBConnector", side_effect=MockConfigDb) as mock_connector:
+            for _ in range(5):
+                manager.num_changes = {"": 1}
+                manager.check_and_update_control_plane_acls("", 1)
+        self.assertEqual(mock_update.call_count, 5)
+        mock_connector.assert_called_once_with(use_unix_socket_path=True, namespace="")
+        connectors = set(id(c.args[1]) for c in mock_update.call_args_list)
+        self.assertEqual(len(connectors), 1)
+
+    @patch("caclmgrd.ControlPlaneAclManager.update_control_plane_acls")
+    def test_update_thread_reconnects_on_db_error(self, mock_update):
+        MockConfigDb.set_config_db({"DEVICE_METADATA": {"localhost": {}}, "FEATURE": {}})
+        manager = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+        manager.debounce_policy = self.caclmgrd.FixedDebouncePolicy(0)
+        manager.lock = {"": threading.Lock()}
+        manager.update_thread = {"": None}
+        with patch("caclmgrd.swsscommon.ConfigDBConnector", side_effect=MockConfigDb) as mock_connector:
+            manager.num_changes = {"": 1}
+            manager.check_and_update_control_plane_acls("", 1)
+            stale_connector = mock_update.call_args.args[1]
+
+            # The kept connector went stale, e.g. after a database restart
+            stale_connector.get_entry = MagicMock(side_effect=RuntimeError("connection lost"))
+            manager.num_changes = {"": 1}
+            manager.check_and_update_control_plane_acls("", 1)
+        self.assertEqual(mock_update.call_count, 2)
+        self.assertEqual(mock_connector.call_count, 2)
+        self.assertIsNot(mock_update.call_args.args[1], stale_connector)
+        self.assertIsNone(manager.thread_exceptions.get(""))
+
+    @patch("caclmgrd.ControlPlaneAclManager.update_control_plane_acls")
+    def test_update_thread_does_not_retry_update_error(self, mock_update):
+        mock_update.side_effect = RuntimeError("update failed")
+        MockConfigDb.set_config_db({"DEVICE_METADATA": {"localhost": {}}, "FEATURE": {}})
+        manager = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+        manager.lock = {"": threading.Lock()}
+        manager.update_thread = {"": None}
+        manager.num_changes = {"": 1}
+        with patch("caclmgrd.swsscommon.ConfigDBConnector", side_effect=MockConfigDb):
+            manager.check_and_update_control_plane_acls("", 1)
+        mock_update.assert_called_once()
+        self.assertIn("update failed", manager.thread_exceptions[""][0])
+
 
     @patch("caclmgrd.swsscommon")
     @patch("os.geteuid", return_value=0)
@@ -154,7 +246,7 @@ class TestCaclmgrd(TestCase):
         manager.allow_bfd_protocol = MagicMock()
         manager.allow_vxlan_port = MagicMock()
         manager.block_vxlan_port = MagicMock()
-        manager.update_dhcp_acl_for_mark_change = MagicMock()
+        manager.update_dhcp_packet_mark = MagicMock()
         manager.update_dhcp_acl = MagicMock()
         manager.setup_dhcp_chain = MagicMock()
         try:
@@ -168,7 +260,7 @@ class TestCaclmgrd(TestCase):
         manager.allow_bfd_protocol.assert_called()
         manager.allow_vxlan_port.assert_not_called()
         manager.block_vxlan_port.assert_not_called()
-        manager.update_dhcp_acl_for_mark_change.assert_called()
+        manager.update_dhcp_packet_mark.assert_called()
         manager.update_dhcp_acl.assert_called()
         manager.setup_dhcp_chain.assert_called()
 
@@ -261,7 +353,7 @@ class TestCaclmgrd(TestCase):
         manager.update_control_plane_acls = MagicMock()
         manager.allow_vxlan_port = MagicMock()
         manager.block_vxlan_port = MagicMock()
-        manager.update_dhcp_acl_for_mark_change = MagicMock()
+        manager.update_dhcp_packet_mark = MagicMock()
         manager.update_dhcp_acl = MagicMock()
         manager.setup_dhcp_chain = MagicMock()
         manager.thread_exceptions = {}
@@ -278,3 +370,83 @@ class TestCaclmgrd(TestCase):
         # Asserting the method calls
         manager.update_control_plane_acls.assert_called()
         mock_kill.assert_called()
+
+    @patch("os.geteuid", return_value=0)
+    def test_run_thread_exception_wakes_up_main_loop(self, mock_geteuid):
+        MockConfigDb.set_config_db({"DEVICE_METADATA": {"localhost": {}}, "FEATURE": {}})
+        manager = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+        manager.debounce_policy = self.caclmgrd.FixedDebouncePolicy(0)
+        manager.monitor_address_changes = MagicMock()
+        manager.update_control_plane_acls_for_namespaces = MagicMock()
+        manager.init_acl_cache = MagicMock()
+
+        failure_time = []
+        def fail_update(namespace, config_db_connector):
+            failure_time.append(time.monotonic())
+            raise Exception("Test exception")
+        manager.update_control_plane_acls = MagicMock(side_effect=fail_update)
+
+        class Killed(Exception):
+            pass
+
+        kill_time = []
+        def kill(pid, sig):
+            kill_time.append(time.monotonic())
+            raise Killed()
+
+        fake_select = FakeSelect()
+        def spawn_update_thread():
+            manager.num_changes[""] = 1
+            manager.update_thread[""] = threading.Thread(target=manager.check_and_update_control_plane_acls, args=("", 1))
+            manager.update_thread[""].start()
+        fake_select.on_first_select = spawn_update_thread
+
+        with patch("caclmgrd.swsscommon") as mock_swsscommon, patch("os.kill", side_effect=kill):
+            mock_swsscommon.Select.return_value = fake_select
+            mock_swsscommon.Select.OBJECT = FakeSelect.OBJECT
+            mock_swsscommon.SelectableEvent = FakeSelectableEvent
+            with self.assertRaises(Killed):
+                manager.run()
+
+        # The main loop only sleeps until the next ruleset verification and is woken up as
+        # soon as the update thread fails
+        self.assertEqual(len(fake_select.timeouts), 1)
+        self.assertGreater(fake_select.timeouts[0], (manager.VERIFY_INTERVAL_SECS - 1) * 1000)
+        self.assertLess(kill_time[0] - failure_time[0], 0.5)
+
+    @patch("os.geteuid", return_value=0)
+    def test_run_verifies_rulesets_in_worker_thread(self, mock_geteuid):
+        MockConfigDb.set_config_db({"DEVICE_METADATA": {"localhost": {}}, "FEATURE": {}})
+        manager = self.caclmgrd.ControlPlaneAclManager("caclmgrd")
+        manager.VERIFY_INTERVAL_SECS = 0
+        manager.monitor_address_changes = MagicMock()
+        manager.update_control_plane_acls_for_namespaces = MagicMock()
+        manager.init_acl_cache = MagicMock()
+
+        verify_threads = []
+        def verify_installed_rulesets():
+            verify_threads.append(threading.current_thread())
+            return [""]
+        manager.verify_installed_rulesets = MagicMock(side_effect=verify_installed_rulesets)
+
+        def schedule_control_plane_acl_update(namespace):
+            # Stop the main loop once the update is scheduled
+            manager.thread_exceptions[namespace] = ("Stop", [])
+            manager.notify_thread_exception()
+        manager.schedule_control_plane_acl_update = MagicMock(side_effect=schedule_control_plane_acl_update)
+
+        class Killed(Exception):
+            pass
+
+        fake_select = FakeSelect()
+        fake_select.on_first_select = lambda: manager.notify_thread_exception()
+        with patch("caclmgrd.swsscommon") as mock_swsscommon, patch("os.kill", side_effect=Killed):
+            mock_swsscommon.Select.return_value = fake_select
+            mock_swsscommon.Select.OBJECT = FakeSelect.OBJECT
+            mock_swsscommon.SelectableEvent = FakeSelectableEvent
+            with self.assertRaises(Killed):
+                manager.run()
+
+        self.assertEqual(len(verify_threads), 1)
+        self.assertIsNot(verify_threads[0], threading.main_thread())
+        manager.schedule_control_plane_acl_update.assert_called_once_with("")
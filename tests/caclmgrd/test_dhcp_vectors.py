@@ -17,21 +17,22 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 "FEATURE": {
                 },
             },
+            "installed_rules": [
+                ("Ethernet4", None),
+                ("Ethernet8", None),
+            ],
+            "dhcp_packet_mark": {},
             "mux_update": [
                 ("Ethernet4", {"state": "active"}),
                 ("Ethernet8", {"state": "active"}),
             ],
-            "expected_subprocess_calls": [
-                call(['iptables', '--check', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet4', '-j', 'DROP']),
-                call(['iptables', '--delete', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet4', '-j', 'DROP']),
-                call(['iptables', '--check', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet8', '-j', 'DROP']),
-                call(['iptables', '--delete', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet8', '-j', 'DROP']),
+            "expected_restore_inputs": [
+                call(input="*filter\n--delete DHCP -m physdev --physdev-in Ethernet4 -j DROP\n--delete DHCP -m physdev --physdev-in Ethernet8 -j DROP\nCOMMIT\n"),
             ],
             "popen_attributes": {
                 'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
             },
-            "call_rc": 0,
-            "mark": None,
         },
     ],
     [
@@ -47,18 +48,20 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 "FEATURE": {
                 },
             },
+            "installed_rules": [
+                ("Ethernet4", "0x67004"),
+            ],
+            "dhcp_packet_mark": {"Ethernet4": "0x67004"},
             "mux_update": [
                 ("Ethernet4", {"state": "active"}),
             ],
-            "expected_subprocess_calls": [
-                call(['iptables', '--check', 'DHCP', '-m', 'mark', '--mark', '0x67004', '-j', 'DROP']),
-                call(['iptables', '--delete', 'DHCP', '-m', 'mark', '--mark', '0x67004', '-j', 'DROP']),
+            "expected_restore_inputs": [
+                call(input="*filter\n--delete DHCP -m mark --mark 0x67004 -j DROP\nCOMMIT\n"),
             ],
             "popen_attributes": {
                 'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
             },
-            "call_rc": 0,
-            "mark": "0x67004",
         },
     ],
     [
@@ -74,19 +77,17 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 "FEATURE": {
                 },
             },
+            "installed_rules": [],
+            "dhcp_packet_mark": {},
             "mux_update": [
                 ("Ethernet4", {"state": "active"}),
                 ("Ethernet8", {"state": "active"}),
             ],
-            "expected_subprocess_calls": [
-                call(['iptables', '--check', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet4', '-j', 'DROP']),
-                call(['iptables', '--check', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet8', '-j', 'DROP']),
-            ],
+            "expected_restore_inputs": [],
             "popen_attributes": {
                 'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
             },
-            "call_rc": 1,
-            "mark": None,
         },
     ],
     [
@@ -102,17 +103,16 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 "FEATURE": {
                 },
             },
+            "installed_rules": [],
+            "dhcp_packet_mark": {"Ethernet4": "0x67004"},
             "mux_update": [
                 ("Ethernet4", {"state": "active"}),
             ],
-            "expected_subprocess_calls": [
-                call(['iptables', '--check', 'DHCP', '-m', 'mark', '--mark', '0x67004', '-j', 'DROP']),
-            ],
+            "expected_restore_inputs": [],
             "popen_attributes": {
                 'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
             },
-            "call_rc": 1,
-            "mark": "0x67004",
         },
     ],
     [
@@ -128,19 +128,20 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 "FEATURE": {
                 },
             },
+            "installed_rules": [
+                ("Ethernet4", None),
+                ("Ethernet8", None),
+            ],
+            "dhcp_packet_mark": {},
             "mux_update": [
                 ("Ethernet4", {"state": "standby"}),
                 ("Ethernet8", {"state": "standby"}),
             ],
-            "expected_subprocess_calls": [
-                call(['iptables', '--check', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet4', '-j', 'DROP']),
-                call(['iptables', '--check', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet8', '-j', 'DROP']),
-            ],
+            "expected_restore_inputs": [],
             "popen_attributes": {
                 'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
             },
-            "call_rc": 0,
-            "mark": None,
         },
     ],
     [
@@ -156,17 +157,18 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 "FEATURE": {
                 },
             },
+            "installed_rules": [
+                ("Ethernet4", "0x67004"),
+            ],
+            "dhcp_packet_mark": {"Ethernet4": "0x67004"},
             "mux_update": [
                 ("Ethernet4", {"state": "standby"}),
             ],
-            "expected_subprocess_calls": [
-                call(['iptables', '--check', 'DHCP', '-m', 'mark', '--mark', '0x67004', '-j', 'DROP']),
-            ],
+            "expected_restore_inputs": [],
             "popen_attributes": {
                 'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
             },
-            "call_rc": 0,
-            "mark": "0x67004",
         },
     ],
     [
@@ -182,21 +184,19 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 "FEATURE": {
                 },
             },
+            "installed_rules": [],
+            "dhcp_packet_mark": {},
             "mux_update": [
                 ("Ethernet4", {"state": "standby"}),
                 ("Ethernet8", {"state": "standby"}),
             ],
-            "expected_subprocess_calls": [
-                call(['iptables', '--check', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet4', '-j', 'DROP']),
-                call(['iptables', '--insert', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet4', '-j', 'DROP']),
-                call(['iptables', '--check', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet8', '-j', 'DROP']),
-                call(['iptables', '--insert', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet8', '-j', 'DROP']),
+            "expected_restore_inputs": [
+                call(input="*filter\n--insert DHCP -m physdev --physdev-in Ethernet4 -j DROP\n--insert DHCP -m physdev --physdev-in Ethernet8 -j DROP\nCOMMIT\n"),
             ],
             "popen_attributes": {
                 'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
             },
-            "call_rc": 1,
-            "mark": None,
         },
     ],
     [
@@ -212,18 +212,18 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 "FEATURE": {
                 },
             },
+            "installed_rules": [],
+            "dhcp_packet_mark": {"Ethernet4": "0x67004"},
             "mux_update": [
                 ("Ethernet4", {"state": "standby"}),
             ],
-            "expected_subprocess_calls": [
-                call(['iptables', '--check', 'DHCP', '-m', 'mark', '--mark', '0x67004', '-j', 'DROP']),
-                call(['iptables', '--insert', 'DHCP', '-m', 'mark', '--mark', '0x67004', '-j', 'DROP']),
+            "expected_restore_inputs": [
+                call(input="*filter\n--insert DHCP -m mark --mark 0x67004 -j DROP\nCOMMIT\n"),
             ],
             "popen_attributes": {
                 'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
             },
-            "call_rc": 1,
-            "mark": "0x67004",
         },
     ],
     [
@@ -239,21 +239,22 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 "FEATURE": {
                 },
             },
+            "installed_rules": [
+                ("Ethernet4", None),
+                ("Ethernet8", None),
+            ],
+            "dhcp_packet_mark": {},
             "mux_update": [
                 ("Ethernet4", {"state": "unknown"}),
                 ("Ethernet8", {"state": "unknown"}),
             ],
-            "expected_subprocess_calls": [
-                call(['iptables', '--check', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet4', '-j', 'DROP']),
-                call(['iptables', '--delete', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet4', '-j', 'DROP']),
-                call(['iptables', '--check', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet8', '-j', 'DROP']),
-                call(['iptables', '--delete', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet8', '-j', 'DROP']),
+            "expected_restore_inputs": [
+                call(input="*filter\n--delete DHCP -m physdev --physdev-in Ethernet4 -j DROP\n--delete DHCP -m physdev --physdev-in Ethernet8 -j DROP\nCOMMIT\n"),
             ],
             "popen_attributes": {
                 'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
             },
-            "call_rc": 0,
-            "mark": None,
         },
     ],
     [
@@ -269,22 +270,24 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 "FEATURE": {
                 },
             },
+            "installed_rules": [
+                ("Ethernet4", "0x67004"),
+            ],
+            "dhcp_packet_mark": {"Ethernet4": "0x67004"},
             "mux_update": [
                 ("Ethernet4", {"state": "unknown"}),
             ],
-            "expected_subprocess_calls": [
-                call(['iptables', '--check',  'DHCP', '-m', 'mark', '--mark', '0x67004', '-j', 'DROP']),
-                call(['iptables', '--delete', 'DHCP', '-m', 'mark', '--mark', '0x67004', '-j', 'DROP']),
+            "expected_restore_inputs": [
+                call(input="*filter\n--delete DHCP -m mark --mark 0x67004 -j DROP\nCOMMIT\n"),
             ],
             "popen_attributes": {
                 'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
             },
-            "call_rc": 0,
-            "mark": "0x67004",
         },
     ],
     [
-        "Uknown_Absent_Interface",
+        "Unknown_Absent_Interface",
         {
             "config_db": {
                 "DEVICE_METADATA": {
@@ -296,23 +299,21 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 "FEATURE": {
                 },
             },
+            "installed_rules": [],
+            "dhcp_packet_mark": {},
             "mux_update": [
                 ("Ethernet4", {"state": "unknown"}),
                 ("Ethernet8", {"state": "unknown"}),
             ],
-            "expected_subprocess_calls": [
-                call(['iptables', '--check', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet4', '-j', 'DROP']),
-                call(['iptables', '--check', 'DHCP', '-m', 'physdev', '--physdev-in', 'Ethernet8', '-j', 'DROP']),
-            ],
+            "expected_restore_inputs": [],
             "popen_attributes": {
                 'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
             },
-            "call_rc": 1,
-            "mark": None,
         },
     ],
     [
-        "Uknown_Absent_Mark",
+        "Unknown_Absent_Mark",
         {
             "config_db": {
                 "DEVICE_METADATA": {
@@ -324,17 +325,131 @@ CACLMGRD_DHCP_TEST_VECTOR = [
                 "FEATURE": {
                 },
             },
+            "installed_rules": [],
+            "dhcp_packet_mark": {"Ethernet4": "0x67004"},
             "mux_update": [
                 ("Ethernet4", {"state": "unknown"}),
             ],
-            "expected_subprocess_calls": [
-                call(['iptables', '--check', 'DHCP', '-m', 'mark', '--mark', '0x67004', '-j', 'DROP']),
+            "expected_restore_inputs": [],
+            "popen_attributes": {
+                'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
+            },
+        },
+    ],
+    [
+        "Standby_Then_Active_Coalesced",
+        {
+            "config_db": {
+                "DEVICE_METADATA": {
+                    "localhost": {
+                        "subtype": "DualToR",
+                        "type": "ToRRouter",
+                    }
+                },
+                "FEATURE": {
+                },
+            },
+            "installed_rules": [],
+            "dhcp_packet_mark": {},
+            "mux_update": [
+                ("Ethernet4", {"state": "standby"}),
+                ("Ethernet4", {"state": "active"}),
+                ("Ethernet8", {"state": "standby"}),
+            ],
+            "expected_restore_inputs": [
+                call(input="*filter\n--insert DHCP -m physdev --physdev-in Ethernet8 -j DROP\nCOMMIT\n"),
+            ],
+            "popen_attributes": {
+                'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
+            },
+        },
+    ],
+    [
+        "Mark_Change_Standby_Interface",
+        {
+            "config_db": {
+                "DEVICE_METADATA": {
+                    "localhost": {
+                        "subtype": "DualToR",
+                        "type": "ToRRouter",
+                    }
+                },
+                "FEATURE": {
+                },
+            },
+            "installed_rules": [
+                ("Ethernet4", None),
+            ],
+            "dhcp_packet_mark": {},
+            "mux_update": [],
+            "mark_update": [
+                ("Ethernet4", "0x67004"),
+            ],
+            "expected_restore_inputs": [
+                call(input="*filter\n--delete DHCP -m physdev --physdev-in Ethernet4 -j DROP\n--insert DHCP -m mark --mark 0x67004 -j DROP\nCOMMIT\n"),
+            ],
+            "popen_attributes": {
+                'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
+            },
+        },
+    ],
+    [
+        "Mark_Change_Active_Interface",
+        {
+            "config_db": {
+                "DEVICE_METADATA": {
+                    "localhost": {
+                        "subtype": "DualToR",
+                        "type": "ToRRouter",
+                    }
+                },
+                "FEATURE": {
+                },
+            },
+            "installed_rules": [],
+            "dhcp_packet_mark": {},
+            "mux_update": [],
+            "mark_update": [
+                ("Ethernet4", "0x67004"),
+            ],
+            "expected_restore_inputs": [],
+            "popen_attributes": {
+                'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
+            },
+        },
+    ],
+    [
+        "Mark_Removed_Standby_Interface",
+        {
+            "config_db": {
+                "DEVICE_METADATA": {
+                    "localhost": {
+                        "subtype": "DualToR",
+                        "type": "ToRRouter",
+                    }
+                },
+                "FEATURE": {
+                },
+            },
+            "installed_rules": [
+                ("Ethernet4", "0x67004"),
+            ],
+            "dhcp_packet_mark": {"Ethernet4": "0x67004"},
+            "mux_update": [],
+            "mark_update": [
+                ("Ethernet4", None),
+            ],
+            "expected_restore_inputs": [
+                call(input="*filter\n--delete DHCP -m mark --mark 0x67004 -j DROP\n--insert DHCP -m physdev --physdev-in Ethernet4 -j DROP\nCOMMIT\n"),
             ],
             "popen_attributes": {
                 'communicate.return_value': ('output', 'error'),
+                'returncode': 0,
             },
-            "call_rc": 1,
-            "mark": "0x67004",
         },
     ],
 ]
@@ -0,0 +1,147 @@
+"""
+    caclmgrd incremental update test vector
+"""
+INCREMENTAL_UPDATE_TEST_VECTOR = [
+    [
+        "Test adding a single rule to SSH_ONLY",
+        {
+            "config_db": {
+                "ACL_TABLE": {
+                    "SSH_ONLY": {
+                        "stage": "ingress",
+                        "type": "CTRLPLANE",
+                        "services": [
+                            "SSH"
+                        ]
+                    }
+                },
+                "ACL_RULE": {
+                    "SSH_ONLY|RULE_1": {
+                        "PACKET_ACTION": "ACCEPT",
+                        "PRIORITY": "9999",
+                        "SRC_IP": "10.0.0.1/32"
+                    },
+                    "SSH_ONLY|RULE_2": {
+                        "PACKET_ACTION": "ACCEPT",
+                        "PRIORITY": "9997",
+                        "SRC_IP": "10.0.0.3/32"
+                    }
+                },
+                "DEVICE_METADATA": {
+                    "localhost": {
+                    }
+                },
+                "FEATURE": {},
+            },
+            "acl_rule_update": {
+                "SSH_ONLY|RULE_1": {
+                    "PACKET_ACTION": "ACCEPT",
+                    "PRIORITY": "9999",
+                    "SRC_IP": "10.0.0.1/32"
+                },
+                "SSH_ONLY|RULE_2": {
+                    "PACKET_ACTION": "ACCEPT",
+                    "PRIORITY": "9997",
+                    "SRC_IP": "10.0.0.3/32"
+                },
+                "SSH_ONLY|RULE_3": {
+                    "PACKET_ACTION": "ACCEPT",
+                    "PRIORITY": "9998",
+                    "SRC_IP": "10.0.0.2/32"
+                }
+            },
+            "expected_restore_calls": [
+                (
+                    ['iptables-restore', '--noflush'],
+                    "*filter\n"
+                    "-I INPUT 11 -p tcp -s 10.0.0.2/32 --dport 22 -j ACCEPT\n"
+                    "COMMIT\n"
+                ),
+            ],
+        }
+    ],
+    [
+        "Test removing a single rule from SSH_ONLY",
+        {
+            "config_db": {
+                "ACL_TABLE": {
+                    "SSH_ONLY": {
+                        "stage": "ingress",
+                        "type": "CTRLPLANE",
+                        "services": [
+                            "SSH"
+                        ]
+                    }
+                },
+                "ACL_RULE": {
+                    "SSH_ONLY|RULE_1": {
+                        "PACKET_ACTION": "ACCEPT",
+                        "PRIORITY": "9999",
+                        "SRC_IPV6": "fc00::1/128"
+                    },
+                    "SSH_ONLY|RULE_2": {
+                        "PACKET_ACTION": "ACCEPT",
+                        "PRIORITY": "9998",
+                        "SRC_IPV6": "fc00::2/128"
+                    }
+                },
+                "DEVICE_METADATA": {
+                    "localhost": {
+                    }
+                },
+                "FEATURE": {},
+            },
+            "acl_rule_update": {
+                "SSH_ONLY|RULE_2": {
+                    "PACKET_ACTION": "ACCEPT",
+                    "PRIORITY": "9998",
+                    "SRC_IPV6": "fc00::2/128"
+                }
+            },
+            "expected_restore_calls": [
+                (
+                    ['ip6tables-restore', '--noflush'],
+                    "*filter\n"
+                    "-D INPUT -p tcp -s fc00::1/128 --dport 22 -j ACCEPT\n"
+                    "COMMIT\n"
+                ),
+            ],
+        }
+    ],
+    [
+        "Test rewriting SSH_ONLY without changes",
+        {
+            "config_db": {
+                "ACL_TABLE": {
+                    "SSH_ONLY": {
+                        "stage": "ingress",
+                        "type": "CTRLPLANE",
+                        "services": [
+                            "SSH"
+                        ]
+                    }
+                },
+                "ACL_RULE": {
+                    "SSH_ONLY|RULE_1": {
+                        "PACKET_ACTION": "ACCEPT",
+                        "PRIORITY": "9999",
+                        "SRC_IP": "10.0.0.1/32"
+                    }
+                },
+                "DEVICE_METADATA": {
+                    "localhost": {
+                    }
+                },
+                "FEATURE": {},
+            },
+            "acl_rule_update": {
+                "SSH_ONLY|RULE_1": {
+                    "PACKET_ACTION": "ACCEPT",
+                    "PRIORITY": "9999",
+                    "SRC_IP": "10.0.0.1/32"
+                }
+            },
+            "expected_restore_calls": [],
+        }
+    ],
+]
@@ -0,0 +1,31 @@
+"""
+    Command line handling shared by the benchmarks
+"""
+
+import json
+
+
+def benchmark_main(parser, run, argv=None):
+    """
+    Parse the benchmark arguments, run the benchmark and write its results as
+    JSON to the file given with --output, or to stdout
+    Args:
+        parser: ArgumentParser of the benchmark options, --output is added to it
+        run: Function running the benchmark with the parsed arguments and
+            returning its results
+        argv: Command line arguments, sys.argv by default
+    Returns:
+        The results of the benchmark
+    """
+    parser.add_argument("--output", help="File to write the JSON results to, instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = run(args)
+
+    output = json.dumps(results, indent=4)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return results
@@ -0,0 +1,139 @@
+import copy
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+from parameterized import parameterized
+from unittest import TestCase, mock
+from pyfakefs.fake_filesystem_unittest import patchfs
+
+from tests.hostcfgd.test_ssh_server_vectors import HOSTCFGD_TEST_SSH_SERVER_VECTOR
+
+test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+sample_output_path = os.path.join(test_path, "hostcfgd/sample_output")
+sys.path.insert(0, modules_path)
+
+# Load the file under test
+hostcfgd_path = os.path.join(scripts_path, 'hostcfgd')
+loader = importlib.machinery.SourceFileLoader('hostcfgd', hostcfgd_path)
+spec = importlib.util.spec_from_loader(loader.name, loader)
+hostcfgd = importlib.util.module_from_spec(spec)
+loader.exec_module(hostcfgd)
+
+NSS_CONF = """passwd:         compat
+group:          files ldap
+shadow:         files ldap
+hosts:          files dns
+"""
+
+
+class TestHostcfgdConfigFileEditor(TestCase):
+    """
+        Test hostcfgd in-process config file editing
+    """
+    def setUp(self):
+        # pyfakefs only patches modules registered in sys.modules
+        self.saved_hostcfgd = sys.modules.get('hostcfgd')
+        sys.modules['hostcfgd'] = hostcfgd
+
+    def tearDown(self):
+        if self.saved_hostcfgd is None:
+            del sys.modules['hostcfgd']
+        else:
+            sys.modules['hostcfgd'] = self.saved_hostcfgd
+
+    @patchfs
+    def test_config_file_editor(self, fs):
+        fs.create_file("/etc/test.conf", contents="#Port 22\nFoo yes\nBar no\n")
+
+        config_file = hostcfgd.ConfigFileEditor("/etc/test.conf")
+        config_file.substitute("^Foo", "yes", "no")
+        config_file.substitute("^Bar", "no", r"\g<0> more", unless="more")
+        config_file.substitute("^Bar", "no", r"\g<0> more", unless="more")
+        config_file.insert("^Foo", "# Foo")
+        config_file.set_option("^#?Port", "Port 222")
+        config_file.set_option("^#?Baz", "Baz 1")
+        self.assertTrue(config_file.is_changed())
+        self.assertTrue(config_file.write())
+        with open("/etc/test.conf") as f:
+            self.assertEqual(f.read(), "Port 222\n# Foo\nFoo no\nBar no more\nBaz 1\n")
+
+        config_file = hostcfgd.ConfigFileEditor("/etc/test.conf")
+        config_file.delete("^(#)?Port [0-9]+$")
+        config_file.insert_at(2, "Port 22")
+        config_file.change("^Baz", "Baz 2")
+        self.assertEqual(config_file.content(), "# Foo\nPort 22\nFoo no\nBar no more\nBaz 2\n")
+
+        # Edits which do not change the file do not write it
+        config_file = hostcfgd.ConfigFileEditor("/etc/test.conf")
+        config_file.substitute("^Foo", "yes", "no")
+        self.assertFalse(config_file.is_changed())
+        self.assertFalse(config_file.write())
+
+    @patchfs
+    def test_config_file_editor_missing_file(self, fs):
+        config_file = hostcfgd.ConfigFileEditor("/etc/missing.conf")
+        config_file.substitute("^Foo", "yes", "no")
+        config_file.set_option("^Foo", "Foo no")
+        self.assertFalse(config_file.is_changed())
+        self.assertFalse(config_file.write())
+        self.assertFalse(os.path.exists("/etc/missing.conf"))
+
+    @parameterized.expand([
+        ("tacacs+", {"10.0.0.1": {"priority": "1"}},
+         "passwd:         tacplus compat\ngroup:          files\nshadow:         files\nhosts:          files dns\n"),
+        ("radius", {},
+         "passwd:         compat radius\ngroup:          files\nshadow:         files\nhosts:          files dns\n"),
+        ("ldap", {},
+         "passwd:         compat ldap\ngroup:          files ldap\nshadow:         files ldap\nhosts:          files dns\n"),
+        ("local", {},
+         "passwd:         compat\ngroup:          files\nshadow:         files\nhosts:          files dns\n"),
+    ])
+    @patchfs
+    def test_aaa_nsswitch(self, login, tacplus_servers, expected_nss_conf, fs):
+        fs.add_real_directory(os.path.join(modules_path, "data/templates"),
+                              target_path=os.path.dirname(hostcfgd.PAM_AUTH_CONF_TEMPLATE))
+        fs.create_dir(os.path.dirname(hostcfgd.PAM_AUTH_CONF))
+        fs.create_dir(os.path.dirname(hostcfgd.LDAP_CONF))
+        fs.create_file(hostcfgd.NSS_CONF, contents=NSS_CONF)
+
+        aaacfg = hostcfgd.AaaCfg(None)
+        aaacfg.authentication = {'login': login}
+        aaacfg.tacplus_servers = tacplus_servers
+        with mock.patch.object(hostcfgd, 'subprocess') as mocked_subprocess, \
+                mock.patch.object(aaacfg, 'notify_audisp_tacplus_reload_config'):
+            aaacfg.modify_conf_file()
+            # Only aaastatsd is started or stopped, no file is edited through a process
+            self.assertEqual(mocked_subprocess.check_call.call_count, 1)
+            mocked_subprocess.call.assert_not_called()
+            mocked_subprocess.run.assert_not_called()
+
+        with open(hostcfgd.NSS_CONF) as f:
+            self.assertEqual(f.read(), expected_nss_conf)
+        self.assertEqual(os.path.exists(hostcfgd.NSS_CONF + ".old"), expected_nss_conf != NSS_CONF)
+
+    @parameterized.expand([(config_name, test_data[config_name]) for test_name, test_data in HOSTCFGD_TEST_SSH_SERVER_VECTOR
+                           for config_name in test_data])
+    @patchfs
+    def test_ssh_server_policies(self, config_name, config_db, fs):
+        fs.add_real_directory(sample_output_path)
+        fs.add_real_file(os.path.join(sample_output_path, "SSH_SERVER/sshd_config.old"), read_only=False,
+                         target_path=hostcfgd.SSH_CONFG)
+
+        sshscfg = hostcfgd.SshServer()
+        with mock.patch.object(hostcfgd, 'subprocess') as mocked_subprocess, \
+                mock.patch.object(hostcfgd, 'run_cmd') as mocked_run_cmd:
+            mocked_subprocess.run.return_value.returncode = 0
+            sshscfg.policies_update('POLICIES', copy.deepcopy(config_db["SSH_SERVER"]["POLICIES"]))
+            sshscfg.flush()
+
+            # A single process validates the whole edited configuration
+            mocked_subprocess.run.assert_called_once_with(['sudo', 'sshd', '-T', '-f', hostcfgd.SSH_CONFG_TMP], capture_output=True)
+            mocked_subprocess.call.assert_not_called()
+            mocked_run_cmd.assert_called_once_with(['systemctl', 'restart', 'ssh'], log_err=True, raise_exception=True)
+
+        with open(hostcfgd.SSH_CONFG) as f, open(os.path.join(sample_output_path, "SSH_SERVER_" + config_name, "sshd_config")) as sample:
+            self.assertEqual(f.read(), sample.read())
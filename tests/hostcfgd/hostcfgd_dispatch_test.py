@@ -0,0 +1,189 @@
+import copy
+import importlib.machinery
+import importlib.util
+import os
+import signal
+import sys
+import threading
+import time
+
+from unittest import TestCase, mock
+
+from tests.common.mock_configdb import MockConfigDb, MockDBConnector
+from .test_vectors import HOSTCFG_DAEMON_CFG_DB
+
+test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+sys.path.insert(0, modules_path)
+
+# Load the file under test
+hostcfgd_path = os.path.join(scripts_path, 'hostcfgd')
+loader = importlib.machinery.SourceFileLoader('hostcfgd', hostcfgd_path)
+spec = importlib.util.spec_from_loader(loader.name, loader)
+hostcfgd = importlib.util.module_from_spec(spec)
+loader.exec_module(hostcfgd)
+
+# Mock swsscommon classes
+hostcfgd.ConfigDBConnector = MockConfigDb
+hostcfgd.DBConnector = MockDBConnector
+hostcfgd.Table = mock.Mock()
+
+KDUMP_DELAY_SECS = 5
+LISTEN_TIMEOUT_SECS = 30
+
+
+class TestHostcfgdDispatch(TestCase):
+    """
+        Test hostcfgd dispatching of table handlers to worker threads
+    """
+    def setUp(self):
+        config_db = copy.deepcopy(HOSTCFG_DAEMON_CFG_DB)
+        config_db['SSH_SERVER'] = {'POLICIES': {'max_sessions': '10'}}
+        config_db['TACPLUS'] = {'global': {'timeout': '5'}}
+        config_db['AAA'] = {'authentication': {'login': 'local'}, 'authorization': {'login': 'local'}}
+        config_db['FIPS'] = {'global': {'enable': 'false'}}
+        config_db['DNS_OPTIONS'] = {'global': {'timeout': '1'}}
+        MockConfigDb.set_config_db(config_db)
+
+    def tearDown(self):
+        MockConfigDb.event_queue = []
+        MockConfigDb.set_config_db({})
+
+    def run_events(self, daemon, event_queue):
+        MockConfigDb.event_queue = event_queue
+        daemon.register_callbacks()
+        daemon.start()
+
+    def test_slow_handler_does_not_delay_other_tables(self):
+        daemon = hostcfgd.HostConfigDaemon()
+        dns_done = threading.Event()
+        latency = {}
+
+        def kdump_handler(key, op, data):
+            # Blocks until the DNS update is applied, which would never happen
+            # if both handlers ran in the same thread
+            latency['kdump_blocked'] = not dns_done.wait(KDUMP_DELAY_SECS)
+
+        def dns_handler(key, op, data):
+            latency['dns'] = time.perf_counter() - start
+            dns_done.set()
+
+        daemon.kdump_handler = kdump_handler
+        daemon.dns_options_handler = dns_handler
+        start = time.perf_counter()
+        self.run_events(daemon, [('KDUMP', 'config'), ('DNS_OPTIONS', 'global')])
+
+        self.assertFalse(latency['kdump_blocked'])
+        self.assertLess(latency['dns'], KDUMP_DELAY_SECS)
+
+    def test_handlers_order(self):
+        daemon = hostcfgd.HostConfigDaemon()
+        calls = []
+
+        def handler(name, delay=0):
+            def run(key, op, data):
+                time.sleep(delay)
+                calls.append((name, key))
+            return run
+
+        # AAA and TACPLUS share a queue
+        daemon.aaa_handler = handler('AAA', delay=0.1)
+        daemon.tacacs_global_handler = handler('TACPLUS')
+        self.run_events(daemon, [('AAA', 'authentication'), ('TACPLUS', 'global'), ('AAA', 'authorization')])
+
+        self.assertEqual(calls, [('AAA', 'authentication'), ('TACPLUS', 'global'), ('AAA', 'authorization')])
+
+    def test_bootloader_ssh_handlers_order(self):
+        daemon = hostcfgd.HostConfigDaemon()
+        calls = []
+
+        def handler(name, delay=0):
+            def run(key, op, data):
+                time.sleep(delay)
+                calls.append(name)
+            return run
+
+        # kdump and FIPS both edit the bootloader config, FIPS and the SSH
+        # server config both restart ssh
+        daemon.kdump_handler = handler('KDUMP', delay=0.1)
+        daemon.fips_config_handler = handler('FIPS', delay=0.1)
+        daemon.ssh_handler = handler('SSH_SERVER')
+        self.run_events(daemon, [('KDUMP', 'config'), ('FIPS', 'global'), ('SSH_SERVER', 'POLICIES')])
+
+        self.assertEqual(calls, ['KDUMP', 'FIPS', 'SSH_SERVER'])
+
+    def test_bootloader_ssh_load_order(self):
+        daemon = hostcfgd.HostConfigDaemon()
+        lock = threading.Lock()
+        running = set()
+        overlaps = {}
+
+        def load(name):
+            def run(*args):
+                with lock:
+                    overlaps[name] = set(running)
+                    running.add(name)
+                time.sleep(0.1)
+                with lock:
+                    running.discard(name)
+            return run
+
+        for attr in ['iptables', 'pamLimitsCfg', 'passwcfg', 'memorystatisticscfg', 'devmetacfg', 'mgmtifacecfg',
+                     'rsyslogcfg', 'ntpcfg', 'serialconscfg', 'bannermsgcfg', 'loggingcfg', 'aaacfg']:
+            setattr(daemon, attr, mock.MagicMock())
+        daemon.kdumpCfg.load = load('KDUMP')
+        daemon.fipscfg.load = load('FIPS')
+        daemon.sshscfg.load = load('SSH_SERVER')
+        daemon.dnscfg.load = load('DNS')
+        init_data = {table: {} for table in ['LOOPBACK_INTERFACE', 'KDUMP', 'PASSW_HARDENING', 'SSH_SERVER',
+                                             'MEMORY_STATISTICS']}
+        with mock.patch.object(daemon, 'load_independent_config'), \
+                mock.patch.object(daemon, 'wait_till_system_init_done'):
+            daemon.load_config(init_data)
+
+        # They are loaded one at a time, as their handlers are run, along
+        # with the other sub-configurations
+        for name in ['KDUMP', 'FIPS', 'SSH_SERVER']:
+            self.assertEqual(overlaps[name] & {'KDUMP', 'FIPS', 'SSH_SERVER'}, set(), name)
+        self.assertEqual(len(overlaps), 4)
+        self.assertTrue(overlaps['DNS'] or any('DNS' in names for names in overlaps.values()))
+
+    def test_handler_error(self):
+        daemon = hostcfgd.HostConfigDaemon()
+        calls = []
+        daemon.kdump_handler = mock.Mock(side_effect=ValueError('kdump'))
+        daemon.dns_options_handler = lambda key, op, data: calls.append(key)
+        daemon.register_callbacks()
+
+        def listen(init_data_handler=None):
+            daemon.config_db.handlers['DNS_OPTIONS']('DNS_OPTIONS', 'global', {'timeout': '1'})
+            daemon.config_db.handlers['KDUMP']('KDUMP', 'config', {'enabled': 'true'})
+            # No event follows
+            time.sleep(LISTEN_TIMEOUT_SECS)
+
+        # The error stops the daemon right away through the SIGTERM handler,
+        # once the other handlers are done
+        start = time.perf_counter()
+        sigterm_handler = signal.signal(signal.SIGTERM, hostcfgd.signal_handler)
+        try:
+            with mock.patch.object(daemon.config_db, 'listen', side_effect=listen):
+                with self.assertRaises(SystemExit) as context:
+                    daemon.start()
+        finally:
+            signal.signal(signal.SIGTERM, sigterm_handler)
+        self.assertEqual(context.exception.code, 128 + signal.SIGTERM)
+        self.assertLess(time.perf_counter() - start, LISTEN_TIMEOUT_SECS)
+        self.assertEqual(calls, ['global'])
+        self.assertIsInstance(daemon.dispatcher.error, ValueError)
+
+    def test_locked_config_db(self):
+        config_db = hostcfgd.LockedConfigDBConnector(MockConfigDb())
+        self.assertEqual(config_db.get_table('TACPLUS'), {'global': {'timeout': '5'}})
+        self.assertEqual(config_db.handlers, {})
+
+        with mock.patch.object(MockConfigDb, 'get_table') as mocked_get_table:
+            mocked_get_table.side_effect = lambda table: self.assertTrue(config_db.lock.locked())
+            config_db.get_table('TACPLUS')
+            mocked_get_table.assert_called_once_with('TACPLUS')
+        self.assertFalse(config_db.lock.locked())
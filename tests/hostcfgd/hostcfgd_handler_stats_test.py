@@ -0,0 +1,131 @@
+import copy
+import importlib.machinery
+import importlib.util
+import os
+import sys
+import time
+
+from unittest import TestCase, mock
+
+from tests.common.mock_configdb import MockConfigDb, MockDBConnector
+from .test_vectors import HOSTCFG_DAEMON_CFG_DB
+
+test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+sys.path.insert(0, modules_path)
+
+# Load the file under test
+hostcfgd_path = os.path.join(scripts_path, 'hostcfgd')
+loader = importlib.machinery.SourceFileLoader('hostcfgd', hostcfgd_path)
+spec = importlib.util.spec_from_loader(loader.name, loader)
+hostcfgd = importlib.util.module_from_spec(spec)
+loader.exec_module(hostcfgd)
+
+# Mock swsscommon classes
+hostcfgd.ConfigDBConnector = MockConfigDb
+hostcfgd.DBConnector = MockDBConnector
+hostcfgd.Table = mock.Mock()
+
+PROCESS_DELAY_SECS = 0.05
+
+
+class TestHostcfgdHandlerStats(TestCase):
+    """
+        Test hostcfgd table handler statistics
+    """
+    def setUp(self):
+        config_db = copy.deepcopy(HOSTCFG_DAEMON_CFG_DB)
+        config_db['KDUMP'] = {'config': {'enabled': 'true'}}
+        config_db['SSH_SERVER'] = {'POLICIES': {'max_sessions': '10'}}
+        MockConfigDb.set_config_db(config_db)
+        hostcfgd.handler_stats.handlers = {}
+        hostcfgd.handler_stats.published = {}
+        hostcfgd.Table.reset_mock()
+
+    def tearDown(self):
+        MockConfigDb.event_queue = []
+        MockConfigDb.set_config_db({})
+
+    def run_events(self, daemon, event_queue):
+        def run_process(*args, **kwargs):
+            time.sleep(PROCESS_DELAY_SECS)
+            return b''
+
+        MockConfigDb.event_queue = event_queue
+        daemon.register_callbacks()
+        with mock.patch.object(hostcfgd, 'subprocess') as mocked_subprocess:
+            mocked_subprocess.check_call.side_effect = run_process
+            mocked_subprocess.check_output.side_effect = run_process
+            daemon.start()
+
+    def test_histogram(self):
+        histogram = hostcfgd.Histogram([1, 2, 5])
+        for value in [0.5, 1, 3, 10]:
+            histogram.observe(value)
+
+        self.assertEqual(histogram.buckets, [2, 0, 1, 1])
+        self.assertEqual(histogram.to_fields('wall_time'), {
+            'wall_time_sum': '14.5',
+            'wall_time_max': '10',
+            'wall_time_buckets': '1:2,2:2,5:3,+Inf:4',
+        })
+
+    def test_handler_stats(self):
+        daemon = hostcfgd.HostConfigDaemon()
+
+        def ssh_handler(key, op, data):
+            hostcfgd.run_cmd(['systemctl', 'restart', 'ssh'])
+            hostcfgd.run_cmd_output(['sshd', '-T'])
+
+        daemon.ssh_handler = ssh_handler
+        self.run_events(daemon, [('KDUMP', 'config'), ('SSH_SERVER', 'POLICIES'), ('SSH_SERVER', 'POLICIES')])
+
+        kdump_stats = hostcfgd.handler_stats.handlers['kdump_handler']
+        self.assertEqual(kdump_stats['wall_time'].count, 1)
+        # One sonic-kdump-config invocation per option
+        self.assertEqual(kdump_stats['subprocess_count'].sum, 6)
+        self.assertGreaterEqual(kdump_stats['subprocess_time'].sum, PROCESS_DELAY_SECS)
+        self.assertGreaterEqual(kdump_stats['wall_time'].sum, kdump_stats['subprocess_time'].sum)
+
+        ssh_stats = hostcfgd.handler_stats.handlers['ssh_handler']
+        self.assertEqual(ssh_stats['wall_time'].count, 2)
+        # Two processes per invocation
+        self.assertEqual(ssh_stats['subprocess_count'].buckets, [0, 0, 2, 0, 0, 0, 0, 0])
+        self.assertGreaterEqual(ssh_stats['subprocess_time'].max, 2 * PROCESS_DELAY_SECS)
+        self.assertEqual(ssh_stats['subprocess_time'].buckets[0], 0)
+
+        hostcfgd.Table.assert_called_once_with(mock.ANY, hostcfgd.HANDLER_STATS_TABLE)
+        # A single write per invocation
+        ssh_writes = [dict(c[0][1]) for c in hostcfgd.handler_stats.table.set.call_args_list if c[0][0] == 'ssh_handler']
+        self.assertEqual([fields['invocations'] for fields in ssh_writes], ['1', '2'])
+        self.assertEqual(ssh_writes[-1]['subprocess_count_sum'], '4')
+        self.assertEqual(ssh_writes[-1]['subprocess_count_buckets'], '0:0,1:0,2:2,5:2,10:2,20:2,50:2,+Inf:2')
+        self.assertIn('wall_time_max', ssh_writes[-1])
+
+    def test_publish_out_of_order(self):
+        handler_stats = hostcfgd.HandlerStats()
+        handler_stats.table = mock.Mock()
+
+        handler_stats.publish('ssh_handler', {'invocations': '2'})
+        # Statistics of an earlier invocation, whose thread was preempted
+        handler_stats.publish('ssh_handler', {'invocations': '1'})
+        handler_stats.table.set.assert_called_once_with('ssh_handler', [('invocations', '2')])
+
+    def test_slow_handler(self):
+        daemon = hostcfgd.HostConfigDaemon()
+        daemon.ssh_handler = lambda key, op, data: hostcfgd.run_cmd(['systemctl', 'restart', 'ssh'])
+
+        with mock.patch.object(hostcfgd.handler_stats, 'slow_secs', PROCESS_DELAY_SECS), \
+                mock.patch.object(hostcfgd.syslog, 'syslog') as mocked_syslog:
+            self.run_events(daemon, [('SSH_SERVER', 'POLICIES')])
+
+        warnings = [c[0][1] for c in mocked_syslog.call_args_list if c[0][0] == hostcfgd.syslog.LOG_WARNING]
+        self.assertEqual(len(warnings), 1)
+        self.assertRegex(warnings[0], r"^<lambda>: slow handler, took [0-9.]+s, [0-9.]+s of which in 1 processes, "
+                                      r"the slowest: \['systemctl', 'restart', 'ssh'\] [0-9.]+s$")
+
+    def test_process_out_of_handler(self):
+        with mock.patch.object(hostcfgd, 'subprocess'):
+            hostcfgd.run_cmd(['systemctl', 'restart', 'ssh'])
+        self.assertEqual(hostcfgd.handler_stats.handlers, {})
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+    hostcfgd initial load benchmark
+
+    Runs HostConfigDaemon.load over an init_data with kdump, loopback, NTP,
+    DNS and syslog config, every process hostcfgd runs taking --latency
+    seconds, and measures the time to reach steady state, pending service
+    restarts included:
+      - loading the sub-configurations one after the other, as hostcfgd used
+        to do
+      - loading independent sub-configurations concurrently
+
+    Sub-configurations which edit files under /etc run one process instead.
+    Results are emitted as JSON so that they can be compared across commits.
+    Run it from the repository root, e.g.:
+
+        python3 -m tests.hostcfgd.hostcfgd_load_benchmark --latency 0.05 --output hostcfgd_load_benchmark.json
+"""
+
+import argparse
+import copy
+import importlib.machinery
+import importlib.util
+import os
+import sys
+import time
+
+from unittest import mock
+
+test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+sys.path.insert(0, modules_path)
+
+from tests.common.benchmark import benchmark_main
+from tests.common.mock_configdb import MockConfigDb, MockDBConnector
+from tests.hostcfgd.test_vectors import HOSTCFG_DAEMON_INIT_CFG_DB
+
+DEFAULT_LATENCY = 0.02
+
+INIT_DATA = {
+    "KDUMP": {
+        "config": {
+            "enabled": "true",
+            "num_dumps": "3",
+            "memory": "0M-2G:256M,2G-4G:320M,4G-8G:384M,8G-16G:448M,16G-32G:768M,32G-:1G",
+            "remote": "true",
+            "ssh_string": "user@localhost",
+            "ssh_path": "/a/b/c"
+        }
+    },
+    "LOOPBACK_INTERFACE": {
+        "Loopback0|10.184.8.233/32": {},
+        "Loopback0|fc00:1::32/128": {}
+    },
+    "DEVICE_METADATA": {
+        "localhost": {
+            "hostname": "sonic",
+            "timezone": "Europe/Kyiv"
+        }
+    },
+    "SYSLOG_SERVER": {
+        "10.0.0.5": {}
+    },
+    "DNS_NAMESERVER": {
+        "1.1.1.1": {}
+    },
+    "MEMORY_STATISTICS": {
+        "memory_statistics": {
+            "enabled": "false"
+        }
+    }
+}
+
+
+def load_hostcfgd():
+    hostcfgd_path = os.path.join(scripts_path, 'hostcfgd')
+    loader = importlib.machinery.SourceFileLoader('hostcfgd', hostcfgd_path)
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    hostcfgd = importlib.util.module_from_spec(spec)
+    loader.exec_module(hostcfgd)
+    hostcfgd.ConfigDBConnector = MockConfigDb
+    hostcfgd.DBConnector = MockDBConnector
+    hostcfgd.Table = mock.Mock()
+    return hostcfgd
+
+
+def generate_init_data():
+    init_data = copy.deepcopy(HOSTCFG_DAEMON_INIT_CFG_DB)
+    init_data.update(copy.deepcopy(INIT_DATA))
+    return init_data
+
+
+def measure_load(hostcfgd, max_workers, latency):
+    """
+    Load the initial config, every process taking latency seconds
+
+    Returns:
+        The load time and the number of processes run
+    """
+    def run_process(*args, **kwargs):
+        time.sleep(latency)
+        return b''
+
+    def run_one_process(*args, **kwargs):
+        hostcfgd.run_cmd(['true'])
+
+    init_data = generate_init_data()
+    MockConfigDb.set_config_db(copy.deepcopy(init_data))
+    with mock.patch.object(hostcfgd, 'subprocess') as mocked_subprocess, \
+            mock.patch.object(hostcfgd, 'LOAD_WORKERS', max_workers):
+        for func in ['check_call', 'check_output', 'call', 'Popen']:
+            getattr(mocked_subprocess, func).side_effect = run_process
+
+        daemon = hostcfgd.HostConfigDaemon()
+        # Sub-configurations editing files under /etc
+        for cfg in ['aaacfg', 'passwcfg', 'sshscfg', 'pamLimitsCfg']:
+            setattr(daemon, cfg, mock.MagicMock())
+        daemon.passwcfg.load.side_effect = run_one_process
+        daemon.sshscfg.load.side_effect = run_one_process
+        daemon.pamLimitsCfg.update_config_file.side_effect = run_one_process
+        daemon.aaacfg.hostname_update.side_effect = run_one_process
+        mocked_subprocess.reset_mock()
+
+        start = time.perf_counter()
+        daemon.load(init_data)
+        hostcfgd.restart_scheduler.flush()
+        elapsed = time.perf_counter() - start
+
+        processes = sum(getattr(mocked_subprocess, func).call_count
+                        for func in ['check_call', 'check_output', 'call', 'Popen'])
+
+    MockConfigDb.set_config_db({})
+    return {
+        "time_secs": elapsed,
+        "processes": processes,
+    }
+
+
+def run(args):
+    hostcfgd = load_hostcfgd()
+    workers = args.workers or hostcfgd.LOAD_WORKERS
+
+    results = {
+        "benchmark": "hostcfgd_load",
+        "latency": args.latency,
+        "workers": workers,
+        "sequential": measure_load(hostcfgd, 1, args.latency),
+        "concurrent": measure_load(hostcfgd, workers, args.latency),
+    }
+    results["speedup"] = results["sequential"]["time_secs"] / results["concurrent"]["time_secs"]
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark hostcfgd initial load")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY,
+                        help="Seconds taken by every process hostcfgd runs")
+    parser.add_argument("--workers", type=int, help="Number of concurrent loads, hostcfgd default by default")
+    return benchmark_main(parser, run, argv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import importlib.machinery
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from unittest import TestCase, mock
+
+from . import hostcfgd_load_benchmark
+
+test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+sys.path.insert(0, modules_path)
+
+# Load the file under test
+hostcfgd_path = os.path.join(scripts_path, 'hostcfgd')
+loader = importlib.machinery.SourceFileLoader('hostcfgd', hostcfgd_path)
+spec = importlib.util.spec_from_loader(loader.name, loader)
+hostcfgd = importlib.util.module_from_spec(spec)
+loader.exec_module(hostcfgd)
+
+
+class TestHostcfgdLoad(TestCase):
+    """
+        Test hostcfgd concurrent initial load
+    """
+    def test_task_graph_order(self):
+        lock = threading.Lock()
+        events = []
+
+        def task(name):
+            def run():
+                with lock:
+                    events.append(('start', name))
+                time.sleep(0.05)
+                with lock:
+                    events.append(('end', name))
+            return run
+
+        hostcfgd.run_task_graph([
+            ('c', task('c'), ['a', 'b']),
+            ('a', task('a'), []),
+            ('b', task('b'), []),
+            ('d', task('d'), ['c']),
+        ])
+
+        # a and b run concurrently, c after both of them, d after c
+        self.assertEqual(set(events[:2]), {('start', 'a'), ('start', 'b')})
+        self.assertEqual(set(events[2:4]), {('end', 'a'), ('end', 'b')})
+        self.assertEqual(events[4:], [('start', 'c'), ('end', 'c'), ('start', 'd'), ('end', 'd')])
+
+    def test_task_graph_failure(self):
+        done = []
+        with self.assertRaises(OSError):
+            hostcfgd.run_task_graph([
+                ('a', mock.Mock(side_effect=OSError('failed')), []),
+                ('b', lambda: done.append('b'), ['c']),
+                ('c', lambda: done.append('c'), ['a']),
+                ('d', lambda: done.append('d'), []),
+            ])
+        # Tasks depending on the failed one are skipped, the others are run
+        self.assertEqual(done, ['d'])
+
+    def test_task_graph_invalid(self):
+        with self.assertRaises(ValueError):
+            hostcfgd.run_task_graph([('a', mock.Mock(), ['b'])])
+
+        func = mock.Mock()
+        with self.assertRaises(ValueError):
+            hostcfgd.run_task_graph([
+                ('a', func, ['b']),
+                ('b', func, ['a']),
+            ])
+        func.assert_not_called()
+
+    def test_hostcfgd_load_benchmark(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = os.path.join(tmpdir, "hostcfgd_load_benchmark.json")
+            hostcfgd_load_benchmark.main(["--latency", "0.02", "--output", output])
+            with open(output) as f:
+                results = json.load(f)
+
+        self.assertEqual(results["sequential"]["processes"], results["concurrent"]["processes"])
+        self.assertGreater(results["sequential"]["processes"], 0)
+        self.assertLess(results["concurrent"]["time_secs"], results["sequential"]["time_secs"])
@@ -82,6 +82,9 @@ class TestHostcfgdPASSWH(TestCase):
         hostcfgd.PAM_RADIUS_AUTH_CONF_TEMPLATE = t_path + "/pam_radius_auth.conf.j2"
         hostcfgd.PAM_PASSWORD_CONF = op_path + "/common-password"
         hostcfgd.ETC_LOGIN_DEF = op_path + "/login.defs"
+        hostcfgd.ETC_PASSWD = op_path + "/passwd"
+        hostcfgd.ETC_SHADOW = op_path + "/shadow"
+        hostcfgd.ETC_PWD_LOCK = op_path + "/.pwd.lock"
         hostcfgd.PAM_AUTH_CONF = op_path + "/common-auth-sonic"
         hostcfgd.NSS_TACPLUS_CONF = op_path + "/tacplus_nss.conf"
         hostcfgd.NSS_RADIUS_CONF = op_path + "/radius_nss.conf"
@@ -94,6 +97,10 @@ class TestHostcfgdPASSWH(TestCase):
         os.mkdir(op_path)
 
         shutil.copyfile(sop_path_common + "/login.defs.old", op_path + "/login.defs")
+        with open(op_path + "/passwd", 'w') as f:
+            f.write("root:x:0:0:root:/root:/bin/bash\nadmin:x:1000:1000::/home/admin:/bin/bash\n")
+        with open(op_path + "/shadow", 'w') as f:
+            f.write("root:*:19000:0:99999:7:::\nadmin:*:19000:0:99999:7:::\n")
         MockConfigDb.set_config_db(test_data[config_name])
         host_config_daemon = hostcfgd.HostConfigDaemon()
 
@@ -135,6 +142,12 @@ class TestHostcfgdPASSWH(TestCase):
         self.assertEqual(out_passw_age_days, sout_passw_age_days)
         self.assertEqual(out_passw_age_warn_days, sout_passw_age_warn_days)
 
+        # existing normal users get the policy of new users
+        with open(op_path + "/shadow") as f:
+            shadow = [line.split(':') for line in f.read().splitlines()]
+        self.assertEqual(shadow[0], "root:*:19000:0:99999:7:::".split(':'))
+        self.assertEqual(shadow[1][4:6], [str(sout_passw_age_days), str(sout_passw_age_warn_days)])
+
     @parameterized.expand(HOSTCFGD_TEST_PASSWH_VECTOR)
     def test_hostcfgd_passwh(self, test_name, test_data):
         """
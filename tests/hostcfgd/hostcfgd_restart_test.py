@@ -0,0 +1,317 @@
+import collections
+import contextlib
+import copy
+import importlib.machinery
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+from unittest import TestCase, mock
+
+from tests.common.mock_configdb import MockConfigDb, MockDBConnector
+from .test_vectors import HOSTCFG_DAEMON_INIT_CFG_DB, HOSTCFG_DAEMON_CFG_DB
+
+test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+sys.path.insert(0, modules_path)
+
+# Load the file under test
+hostcfgd_path = os.path.join(scripts_path, 'hostcfgd')
+loader = importlib.machinery.SourceFileLoader('hostcfgd', hostcfgd_path)
+spec = importlib.util.spec_from_loader(loader.name, loader)
+hostcfgd = importlib.util.module_from_spec(spec)
+loader.exec_module(hostcfgd)
+
+# Mock swsscommon classes
+hostcfgd.ConfigDBConnector = MockConfigDb
+hostcfgd.DBConnector = MockDBConnector
+hostcfgd.Table = mock.Mock()
+
+# Config written by a config reload, on top of HOSTCFG_DAEMON_CFG_DB
+CONFIG_RELOAD_CFG_DB = {
+    "SYSLOG_CONFIG": {
+        "GLOBAL": {"rate_limit_interval": "30"}
+    },
+    "SYSLOG_SERVER": {
+        "10.0.0.5": {"port": "514"},
+        "10.0.0.6": {"port": "514"}
+    },
+    "NTP_SERVER": {
+        "0.debian.pool.ntp.org": {},
+        "1.debian.pool.ntp.org": {}
+    },
+    "DNS_NAMESERVER": {
+        "1.1.1.1": {},
+        "8.8.8.8": {}
+    },
+    "DEVICE_METADATA": {
+        "localhost": {
+            "hostname": "new-hostname",
+            "timezone": "Europe/Kyiv",
+            "syslog_with_osversion": "true"
+        }
+    },
+    "MGMT_VRF_CONFIG": {},
+}
+
+
+def restarted_unit(cmd):
+    if 'restart' not in cmd:
+        return None
+    # systemctl restart <unit> or service <unit> restart
+    return cmd[-1] if cmd[-2] == 'restart' else cmd[-2]
+
+
+class TestHostcfgdRestartScheduler(TestCase):
+    """
+        Test hostcfgd coalescing of service restarts
+    """
+    def setUp(self):
+        self.scheduler = hostcfgd.ServiceRestartScheduler()
+
+    def test_restart_out_of_hold(self):
+        with mock.patch.object(hostcfgd, 'run_cmd') as mocked_run_cmd:
+            self.scheduler.restart('chrony', raise_exception=True)
+            mocked_run_cmd.assert_called_once_with(['systemctl', 'restart', 'chrony'], True, True)
+        self.assertEqual(self.scheduler.pending, {})
+
+    def test_restart_in_hold(self):
+        with mock.patch.object(hostcfgd, 'run_cmd') as mocked_run_cmd:
+            with self.scheduler.hold('ntp'):
+                self.scheduler.restart('chrony', raise_exception=True)
+                self.scheduler.restart('rsyslog')
+                with self.scheduler.hold('ntp'):
+                    self.scheduler.restart('chrony')
+                    self.scheduler.restart('rsyslog-config')
+                self.scheduler.restart('interfaces-config', ['sudo', 'systemctl', 'restart', 'interfaces-config'])
+                mocked_run_cmd.assert_not_called()
+
+            # Once per unit, in dependency order, rsyslog being restarted by rsyslog-config
+            self.assertEqual(mocked_run_cmd.call_args_list, [
+                mock.call(['sudo', 'systemctl', 'restart', 'interfaces-config'], True, True),
+                mock.call(['systemctl', 'restart', 'rsyslog-config'], True, True),
+                mock.call(['systemctl', 'restart', 'chrony'], True, True),
+            ])
+        self.assertEqual(self.scheduler.pending, {})
+
+    def test_restart_settle_window(self):
+        scheduler = hostcfgd.ServiceRestartScheduler(settle_secs=60)
+        with mock.patch.object(hostcfgd, 'run_cmd') as mocked_run_cmd:
+            with scheduler.hold('ntp'):
+                scheduler.restart('chrony')
+            timer = scheduler.timers['ntp']
+            self.assertTrue(timer.is_alive())
+
+            # A new event within the window postpones the restarts
+            with scheduler.hold('ntp'):
+                self.assertTrue(timer.finished.is_set())
+                self.assertEqual(scheduler.timers, {})
+                scheduler.restart('chrony')
+                scheduler.cancel('interfaces-config')
+            mocked_run_cmd.assert_not_called()
+
+            scheduler.flush()
+            mocked_run_cmd.assert_called_once_with(['systemctl', 'restart', 'chrony'], True, True)
+            self.assertEqual(scheduler.timers, {})
+
+    def test_restart_holders(self):
+        lock_free = []
+
+        def acquire_lock():
+            if self.scheduler.lock.acquire(timeout=1):
+                self.scheduler.lock.release()
+                lock_free.append(True)
+            else:
+                lock_free.append(False)
+
+        def run_cmd(cmd, log_err, raise_exception):
+            # The lock is not held while restarting
+            thread = threading.Thread(target=acquire_lock)
+            thread.start()
+            thread.join()
+
+        with mock.patch.object(hostcfgd, 'run_cmd', side_effect=run_cmd) as mocked_run_cmd:
+            with self.scheduler.hold('syslog'):
+                self.scheduler.restart('rsyslog-config')
+                with self.scheduler.hold('device_metadata'):
+                    self.scheduler.restart('rsyslog-config')
+                    self.scheduler.restart('hostname-config')
+
+                # A holder only waits for its own handlers
+                mocked_run_cmd.assert_called_once_with(['systemctl', 'restart', 'hostname-config'], True, True)
+                mocked_run_cmd.reset_mock()
+
+                # A unit requested by several holders waits for all of them
+                self.assertEqual(self.scheduler.pending, {'rsyslog-config': ['systemctl', 'restart', 'rsyslog-config']})
+                self.assertEqual(self.scheduler.requesters, {'rsyslog-config': {'syslog'}})
+            mocked_run_cmd.assert_called_once_with(['systemctl', 'restart', 'rsyslog-config'], True, True)
+        self.assertEqual(lock_free, [True, True])
+        self.assertEqual((self.scheduler.pending, self.scheduler.requesters), ({}, {}))
+
+    def test_restart_failure(self):
+        failures = []
+
+        def run_cmd(cmd, log_err, raise_exception):
+            if 'rsyslog-config' in cmd:
+                raise hostcfgd.subprocess.CalledProcessError(1, cmd)
+
+        with mock.patch.object(hostcfgd, 'run_cmd', side_effect=run_cmd):
+            with self.scheduler.hold('syslog'):
+                self.scheduler.restart('rsyslog-config', on_failure=lambda: failures.append('rsyslog-config'))
+                self.scheduler.restart('rsyslog', on_failure=lambda: failures.append('rsyslog'))
+                self.scheduler.restart('chrony', on_failure=lambda: failures.append('chrony'))
+        # rsyslog is not restarted either
+        self.assertEqual(failures, ['rsyslog-config', 'rsyslog'])
+        self.assertEqual(self.scheduler.failure_callbacks, {})
+
+    def test_restart_max_defer(self):
+        scheduler = hostcfgd.ServiceRestartScheduler(settle_secs=60, max_defer_secs=0.2)
+        with mock.patch.object(hostcfgd, 'run_cmd') as mocked_run_cmd:
+            with scheduler.hold('ntp'):
+                scheduler.restart('chrony')
+            timer = scheduler.timers['ntp']
+
+            # New events stop postponing the restarts once overdue
+            time.sleep(0.2)
+            with scheduler.hold('ntp'):
+                self.assertIs(scheduler.timers['ntp'], timer)
+            timer.join(5)
+            mocked_run_cmd.assert_called_once_with(['systemctl', 'restart', 'chrony'], True, True)
+            self.assertEqual((scheduler.timers, scheduler.since), ({}, {}))
+
+    def test_ntp_restart_failure(self):
+        ntpcfg = hostcfgd.NtpCfg()
+        ntpcfg.load({'global': {'vrf': 'default'}}, {}, {})
+
+        with mock.patch.object(hostcfgd, 'run_cmd') as mocked_run_cmd:
+            mocked_run_cmd.side_effect = hostcfgd.subprocess.CalledProcessError(1, 'chrony')
+            with self.scheduler.hold('aaa'), \
+                    mock.patch.object(hostcfgd, 'restart_scheduler', self.scheduler):
+                ntpcfg.ntp_srv_key_update({'0.debian.pool.ntp.org': {}}, {})
+            mocked_run_cmd.assert_called_once()
+
+            # The failed restart is done again on the next update, even if
+            # unchanged
+            mocked_run_cmd.reset_mock()
+            mocked_run_cmd.side_effect = None
+            ntpcfg.ntp_global_update('global', {'vrf': 'default'})
+            mocked_run_cmd.assert_called_once_with(['systemctl', 'restart', 'chrony'], True, True)
+            ntpcfg.ntp_srv_key_update({'0.debian.pool.ntp.org': {}}, {})
+            mocked_run_cmd.assert_called_once()
+
+    def test_restart_bind(self):
+        with mock.patch.object(hostcfgd, 'run_cmd') as mocked_run_cmd:
+            with self.scheduler.hold('load'):
+                thread = threading.Thread(target=self.scheduler.bind('load', self.scheduler.restart),
+                                          args=('chrony',))
+                thread.start()
+                thread.join()
+                # Restarts requested out of a hold are run right away
+                thread = threading.Thread(target=self.scheduler.restart, args=('rsyslog',))
+                thread.start()
+                thread.join()
+                mocked_run_cmd.assert_called_once_with(['systemctl', 'restart', 'rsyslog'], True, False)
+                mocked_run_cmd.reset_mock()
+            mocked_run_cmd.assert_called_once_with(['systemctl', 'restart', 'chrony'], True, True)
+
+    def test_load_concurrent_restarts(self):
+        MockConfigDb.set_config_db(copy.deepcopy(HOSTCFG_DAEMON_CFG_DB))
+        with mock.patch.object(hostcfgd, 'subprocess'), \
+                mock.patch.object(hostcfgd, 'check_output_pipe'), \
+                mock.patch.object(hostcfgd, 'run_cmd') as mocked_run_cmd:
+            daemon = hostcfgd.HostConfigDaemon()
+            daemon.aaacfg = mock.MagicMock()
+            daemon.iptables = mock.MagicMock()
+            daemon.passwcfg = mock.MagicMock()
+            daemon.sshscfg = mock.MagicMock()
+            daemon.pamLimitsCfg = mock.MagicMock()
+
+            # The device metadata and the syslog config are loaded at the same
+            # time, both of them restarting rsyslog
+            barrier = threading.Barrier(2, timeout=10)
+            devmeta_load, rsyslog_load = daemon.devmetacfg.load, daemon.rsyslogcfg.load
+            loads = []
+
+            def load_devmeta(dev_meta):
+                barrier.wait()
+                devmeta_load(dev_meta)
+                loads.append('device_metadata')
+
+            def load_rsyslog(syslog_cfg, syslog_srv):
+                barrier.wait()
+                rsyslog_load(syslog_cfg, syslog_srv)
+                daemon.rsyslogcfg.update_rsyslog_config(syslog_cfg, {'10.0.0.5': {'port': '514'}})
+                loads.append('rsyslog')
+
+            daemon.devmetacfg.load = load_devmeta
+            daemon.rsyslogcfg.load = load_rsyslog
+            init_data = copy.deepcopy(HOSTCFG_DAEMON_INIT_CFG_DB)
+            init_data["DEVICE_METADATA"] = {"localhost": {"hostname": "old-hostname", "timezone": "Europe/Kyiv"}}
+            daemon.load(init_data)
+            loaded = mocked_run_cmd.call_count
+            hostcfgd.restart_scheduler.flush()
+
+        # Nothing is restarted before the whole config is loaded, then
+        # rsyslog-config restarts rsyslog once for both of them
+        units = [restarted_unit(c[0][0]) for c in mocked_run_cmd.call_args_list if restarted_unit(c[0][0])]
+        self.assertEqual(sorted(loads), ['device_metadata', 'rsyslog'])
+        self.assertEqual([c for c in mocked_run_cmd.call_args_list[:loaded] if restarted_unit(c[0][0])], [])
+        self.assertEqual(units.count('rsyslog-config'), 1)
+        self.assertNotIn('rsyslog', units)
+        self.assertEqual(hostcfgd.restart_scheduler.pending, {})
+        MockConfigDb.set_config_db({})
+
+    def replay_config_reload(self):
+        """
+        Load the initial config, then replay every entry of the new config as
+        the config events of a config reload, and count the restarts per unit.
+        """
+        config_db = copy.deepcopy(HOSTCFG_DAEMON_CFG_DB)
+        config_db.update(copy.deepcopy(CONFIG_RELOAD_CFG_DB))
+        MockConfigDb.set_config_db(config_db)
+        MockConfigDb.event_queue = [(table, key) for table, entries in config_db.items()
+                                    for key in entries if table not in ['KDUMP', 'MEMORY_STATISTICS']]
+
+        with mock.patch.object(hostcfgd, 'subprocess'), \
+                mock.patch.object(hostcfgd, 'check_output_pipe'), \
+                mock.patch.object(hostcfgd, 'run_cmd') as mocked_run_cmd:
+            daemon = hostcfgd.HostConfigDaemon()
+            daemon.aaacfg = mock.MagicMock()
+            daemon.iptables = mock.MagicMock()
+            daemon.passwcfg = mock.MagicMock()
+            daemon.sshscfg = mock.MagicMock()
+            daemon.pamLimitsCfg = mock.MagicMock()
+            daemon.register_callbacks()
+
+            init_data = copy.deepcopy(HOSTCFG_DAEMON_INIT_CFG_DB)
+            init_data["DEVICE_METADATA"] = {"localhost": {"hostname": "old-hostname", "timezone": "Etc/UTC"}}
+            daemon.load(init_data)
+            daemon.start()
+
+        MockConfigDb.event_queue = []
+        MockConfigDb.set_config_db({})
+        return collections.Counter(restarted_unit(c[0][0]) for c in mocked_run_cmd.call_args_list
+                                   if restarted_unit(c[0][0]))
+
+    def test_config_reload_restarts(self):
+        restarts = self.replay_config_reload()
+        # rsyslog, restarted for the timezone change, is restarted by rsyslog-config
+        self.assertEqual(restarts, {
+            'interfaces-config': 1,
+            'resolv-config': 1,
+            'hostname-config': 1,
+            'rsyslog-config': 1,
+            'chrony': 1,
+        })
+        self.assertEqual(hostcfgd.restart_scheduler.timers, {})
+        self.assertEqual(hostcfgd.restart_scheduler.pending, {})
+
+        # Every handler restarting its services by itself
+        with mock.patch.object(hostcfgd.restart_scheduler, 'hold', contextlib.nullcontext):
+            restarts = self.replay_config_reload()
+        self.assertGreater(restarts['chrony'], 1)
+        self.assertGreater(restarts['resolv-config'], 1)
+        self.assertGreater(restarts['rsyslog-config'], 1)
@@ -0,0 +1,155 @@
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+from unittest import TestCase, mock
+from pyfakefs.fake_filesystem_unittest import patchfs
+
+test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+sys.path.insert(0, modules_path)
+
+# Load the file under test
+hostcfgd_path = os.path.join(scripts_path, 'hostcfgd')
+loader = importlib.machinery.SourceFileLoader('hostcfgd', hostcfgd_path)
+spec = importlib.util.spec_from_loader(loader.name, loader)
+hostcfgd = importlib.util.module_from_spec(spec)
+loader.exec_module(hostcfgd)
+
+NUM_USERS = 5000
+LOGIN_DEFS = "UID_MIN 1000\nUID_MAX 60000\nPASS_MAX_DAYS 99999\nPASS_WARN_AGE 7\n"
+SYSTEM_PASSWD = "root:x:0:0:root:/root:/bin/bash\ndaemon:x:1:1:daemon:/usr/sbin:/usr/sbin/nologin\n"
+SYSTEM_SHADOW = "root:*:19000:0:99999:7:::\ndaemon:*:19000:0:99999:7:::\n"
+
+
+def generate_users(num_users):
+    passwd = SYSTEM_PASSWD + ''.join("user{0}:x:{1}:{1}::/home/user{0}:/bin/bash\n".format(idx, 1000 + idx)
+                                     for idx in range(num_users))
+    shadow = SYSTEM_SHADOW + ''.join("user{}:$6$salt$hash:19000:0:99999:7:::\n".format(idx)
+                                     for idx in range(num_users))
+    return passwd, shadow
+
+
+class TestHostcfgdShadow(TestCase):
+    """
+        Test hostcfgd password aging of existing users
+    """
+    def setUp(self):
+        # pyfakefs only patches modules registered in sys.modules
+        self.saved_hostcfgd = sys.modules.get('hostcfgd')
+        sys.modules['hostcfgd'] = hostcfgd
+
+    def tearDown(self):
+        if self.saved_hostcfgd is None:
+            del sys.modules['hostcfgd']
+        else:
+            sys.modules['hostcfgd'] = self.saved_hostcfgd
+
+    def setup_fs(self, fs, num_users=NUM_USERS):
+        passwd, shadow = generate_users(num_users)
+        fs.create_file(hostcfgd.ETC_LOGIN_DEF, contents=LOGIN_DEFS)
+        fs.create_file(hostcfgd.ETC_PASSWD, contents=passwd)
+        fs.create_file(hostcfgd.ETC_SHADOW, contents=shadow, st_mode=0o100640)
+        os.chown(hostcfgd.ETC_SHADOW, 0, 42)
+
+    def read_shadow(self):
+        with open(hostcfgd.ETC_SHADOW) as f:
+            return [line.split(':') for line in f.read().splitlines()]
+
+    @patchfs
+    def test_passwd_aging_expire_modify(self, fs):
+        self.setup_fs(fs)
+        passwcfg = hostcfgd.PasswHardening()
+
+        with mock.patch.object(hostcfgd, 'subprocess') as mocked_subprocess:
+            passwcfg.passwd_aging_expire_modify(180, 'MAX_DAYS')
+            passwcfg.passwd_aging_expire_modify(-1, 'WARN_DAYS')
+            mocked_subprocess.Popen.assert_not_called()
+            mocked_subprocess.check_output.assert_not_called()
+
+        shadow = self.read_shadow()
+        self.assertEqual(len(shadow), NUM_USERS + 2)
+        # System accounts are left alone
+        self.assertEqual(shadow[:2], [line.split(':') for line in SYSTEM_SHADOW.splitlines()])
+        for idx, fields in enumerate(shadow[2:]):
+            self.assertEqual(fields, ["user{}".format(idx), "$6$salt$hash", "19000", "0", "180", "", "", "", ""])
+
+        # Owner and mode are kept, and no lock is left
+        shadow_stat = os.stat(hostcfgd.ETC_SHADOW)
+        self.assertEqual((shadow_stat.st_mode & 0o777, shadow_stat.st_uid, shadow_stat.st_gid), (0o640, 0, 42))
+        self.assertEqual(sorted(os.listdir("/etc")), ['.pwd.lock', 'login.defs', 'passwd', 'shadow'])
+
+    @patchfs
+    def test_passwd_aging_expire_secure_write(self, fs):
+        self.setup_fs(fs, num_users=10)
+        # Left over by an interrupted update
+        fs.create_file(hostcfgd.ETC_SHADOW + "+", contents="stale", st_mode=0o100644)
+        passwcfg = hostcfgd.PasswHardening()
+
+        fchmod = hostcfgd.os.fchmod
+        modes = []
+
+        def record_fchmod(fd, mode):
+            modes.append((os.fstat(fd).st_size, os.fstat(fd).st_mode & 0o777))
+            fchmod(fd, mode)
+
+        with mock.patch.object(hostcfgd.os, 'fchmod', side_effect=record_fchmod):
+            passwcfg.passwd_aging_expire_modify(30, 'MAX_DAYS')
+        # The hashes are written once the mode is restricted
+        self.assertEqual(modes, [(0, 0o600)])
+        self.assertEqual(self.read_shadow()[2][4], "30")
+        self.assertFalse(os.path.exists(hostcfgd.ETC_SHADOW + "+"))
+
+        # A failed write leaves neither the shadow file changed nor shadow+
+        with mock.patch.object(hostcfgd.os, 'fsync', side_effect=OSError("no space left")), \
+                mock.patch.object(hostcfgd.syslog, 'syslog') as mocked_syslog:
+            passwcfg.passwd_aging_expire_modify(60, 'MAX_DAYS')
+            mocked_syslog.assert_any_call(hostcfgd.syslog.LOG_ERR,
+                                          "failed to set MAX_DAYS of normal users to 60: no space left")
+        self.assertEqual(self.read_shadow()[2][4], "30")
+        self.assertFalse(os.path.exists(hostcfgd.ETC_SHADOW + "+"))
+        self.assertEqual(oct(os.stat(hostcfgd.ETC_SHADOW).st_mode & 0o777), oct(0o640))
+
+    @patchfs
+    def test_passwd_aging_expire_unchanged(self, fs):
+        self.setup_fs(fs, num_users=10)
+        inode = os.stat(hostcfgd.ETC_SHADOW).st_ino
+
+        hostcfgd.PasswHardening().passwd_aging_expire_modify(99999, 'MAX_DAYS')
+        self.assertEqual(os.stat(hostcfgd.ETC_SHADOW).st_ino, inode)
+
+    @patchfs
+    def test_passwd_aging_users_out_of_shadow(self, fs):
+        self.setup_fs(fs, num_users=2)
+        with open(hostcfgd.ETC_PASSWD, 'a') as f:
+            f.write("+@netgroup::::::\nnoshadow:x:2000:2000::/home/noshadow:/bin/bash\n")
+
+        with mock.patch.object(hostcfgd.syslog, 'syslog') as mocked_syslog:
+            hostcfgd.PasswHardening().passwd_aging_expire_modify(30, 'MAX_DAYS')
+            mocked_syslog.assert_any_call(hostcfgd.syslog.LOG_ERR, "failed, no {} entry for users: ['noshadow']"
+                                                                   .format(hostcfgd.ETC_SHADOW))
+        self.assertEqual([fields[4] for fields in self.read_shadow()], ["99999", "99999", "30", "30"])
+
+    @patchfs
+    def test_shadow_lock(self, fs):
+        self.setup_fs(fs, num_users=2)
+        passwcfg = hostcfgd.PasswHardening()
+
+        # Lock left by a process which does not exist anymore
+        fs.create_file(hostcfgd.ETC_SHADOW + ".lock", contents="4194305")
+        with mock.patch.object(hostcfgd.os, 'kill', side_effect=ProcessLookupError):
+            passwcfg.passwd_aging_expire_modify(30, 'MAX_DAYS')
+        self.assertEqual(self.read_shadow()[2][4], "30")
+        self.assertFalse(os.path.exists(hostcfgd.ETC_SHADOW + ".lock"))
+
+        # Lock held by a running process
+        fs.create_file(hostcfgd.ETC_SHADOW + ".lock", contents=str(os.getppid()))
+        with mock.patch.object(hostcfgd, 'SHADOW_LOCK_TRIES', 2), \
+                mock.patch.object(hostcfgd, 'SHADOW_LOCK_RETRY_SECS', 0):
+            passwcfg.passwd_aging_expire_modify(60, 'MAX_DAYS')
+        self.assertEqual(self.read_shadow()[2][4], "30")
+        with open(hostcfgd.ETC_SHADOW + ".lock") as f:
+            self.assertEqual(f.read(), str(os.getppid()))
+        self.assertFalse(os.path.exists("{}.{}".format(hostcfgd.ETC_SHADOW, os.getpid())))
@@ -0,0 +1,177 @@
+import copy
+import importlib.machinery
+import importlib.util
+import os
+import sys
+import threading
+
+from unittest import TestCase, mock
+from pyfakefs.fake_filesystem_unittest import patchfs
+
+from tests.common.mock_configdb import MockConfigDb, MockDBConnector
+from .test_vectors import HOSTCFG_DAEMON_CFG_DB
+
+test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+sample_output_path = os.path.join(test_path, "hostcfgd/sample_output")
+sys.path.insert(0, modules_path)
+
+# Load the file under test
+hostcfgd_path = os.path.join(scripts_path, 'hostcfgd')
+loader = importlib.machinery.SourceFileLoader('hostcfgd', hostcfgd_path)
+spec = importlib.util.spec_from_loader(loader.name, loader)
+hostcfgd = importlib.util.module_from_spec(spec)
+loader.exec_module(hostcfgd)
+
+# Mock swsscommon classes
+hostcfgd.ConfigDBConnector = MockConfigDb
+hostcfgd.DBConnector = MockDBConnector
+hostcfgd.Table = mock.Mock()
+
+SETTLE_SECS = 0.2
+
+# Fields of SSH_SERVER|POLICIES set one after the other by automation
+POLICIES_BURST = [
+    {'login_timeout': '60'},
+    {'login_timeout': '60', 'authentication_retries': '8'},
+    {'login_timeout': '60', 'authentication_retries': '8', 'ports': '22,2222'},
+    {'login_timeout': '60', 'authentication_retries': '8', 'ports': '22,2222', 'inactivity_timeout': '30'},
+    {'login_timeout': '60', 'authentication_retries': '8', 'ports': '22,2222', 'inactivity_timeout': '30',
+     'password_authentication': 'false'},
+]
+
+
+class TestHostcfgdSshPolicies(TestCase):
+    """
+        Test hostcfgd coalescing of SSH server policies updates
+    """
+    def setUp(self):
+        # pyfakefs only patches modules registered in sys.modules
+        self.saved_hostcfgd = sys.modules.get('hostcfgd')
+        sys.modules['hostcfgd'] = hostcfgd
+
+    def tearDown(self):
+        if self.saved_hostcfgd is None:
+            del sys.modules['hostcfgd']
+        else:
+            sys.modules['hostcfgd'] = self.saved_hostcfgd
+        MockConfigDb.event_queue = []
+        MockConfigDb.set_config_db({})
+
+    def setup_fs(self, fs):
+        fs.add_real_file(os.path.join(sample_output_path, "SSH_SERVER/sshd_config.old"), read_only=False,
+                         target_path=hostcfgd.SSH_CONFG)
+
+    def replay_burst(self, sshscfg, burst):
+        """
+        Replay the policies updates, and wait for them to be applied
+
+        Returns:
+            The number of sshd config validations and of ssh restarts
+        """
+        with mock.patch.object(hostcfgd, 'subprocess') as mocked_subprocess, \
+                mock.patch.object(hostcfgd, 'run_cmd') as mocked_run_cmd:
+            mocked_subprocess.run.return_value.returncode = 0
+            for policies in burst:
+                sshscfg.policies_update('POLICIES', copy.deepcopy(policies))
+                # Nothing is applied until the updates settle
+                mocked_run_cmd.assert_not_called()
+
+            timer = sshscfg.timer
+            timer.join(SETTLE_SECS * 10)
+            self.assertFalse(timer.is_alive())
+            self.assertIsNone(sshscfg.timer)
+            return mocked_subprocess.run.call_count, mocked_run_cmd.call_count
+
+    @patchfs
+    def test_policies_burst(self, fs):
+        self.setup_fs(fs)
+        sshscfg = hostcfgd.SshServer(settle_secs=SETTLE_SECS)
+
+        self.assertEqual(self.replay_burst(sshscfg, POLICIES_BURST), (1, 1))
+        with open(hostcfgd.SSH_CONFG) as f:
+            sshd_config = f.read().splitlines()
+        for line in ['LoginGraceTime 60', 'MaxAuthTries 8', 'Port 22', 'Port 2222', 'ClientAliveInterval 1800',
+                     'PasswordAuthentication no']:
+            self.assertIn(line, sshd_config)
+
+        # Policies changed back within the window, or set again
+        self.assertEqual(self.replay_burst(sshscfg, [{'login_timeout': '120'}, POLICIES_BURST[-1]]), (0, 0))
+        self.assertEqual(self.replay_burst(sshscfg, POLICIES_BURST[-1:]), (0, 0))
+
+    @patchfs
+    def test_policies_validation_failure(self, fs):
+        self.setup_fs(fs)
+        sshscfg = hostcfgd.SshServer(settle_secs=0)
+
+        with mock.patch.object(hostcfgd, 'subprocess') as mocked_subprocess, \
+                mock.patch.object(hostcfgd, 'run_cmd') as mocked_run_cmd:
+            mocked_subprocess.run.return_value.returncode = 1
+            sshscfg.policies_update('POLICIES', {'login_timeout': '60'})
+            mocked_run_cmd.assert_not_called()
+
+            # The same policies are applied again on the next update
+            mocked_subprocess.run.return_value.returncode = 0
+            sshscfg.policies_update('POLICIES', {'login_timeout': '60'})
+            self.assertEqual(mocked_subprocess.run.call_count, 2)
+            mocked_run_cmd.assert_called_once_with(['systemctl', 'restart', 'ssh'], log_err=True, raise_exception=True)
+
+    @patchfs
+    def test_policies_dispatch(self, fs):
+        self.setup_fs(fs)
+        dispatched = []
+        sshscfg = hostcfgd.SshServer(settle_secs=SETTLE_SECS, dispatch=dispatched.append)
+
+        with mock.patch.object(hostcfgd, 'run_cmd') as mocked_run_cmd:
+            sshscfg.policies_update('POLICIES', {'login_timeout': '60'})
+            sshscfg.timer.join(SETTLE_SECS * 10)
+            # The deferred update is handed over instead of being run by the timer
+            self.assertEqual(dispatched, [sshscfg.modify_conf_file])
+            mocked_run_cmd.assert_not_called()
+
+    def test_policies_dispatch_queue(self):
+        MockConfigDb.set_config_db(copy.deepcopy(HOSTCFG_DAEMON_CFG_DB))
+        daemon = hostcfgd.HostConfigDaemon()
+        threads = []
+
+        # Run by the SSH_SERVER handler queue, within its restart hold
+        daemon.sshscfg.dispatch(lambda: threads.append((threading.current_thread().name,
+                                                        hostcfgd.restart_scheduler.holder())))
+        daemon.dispatcher.join()
+        queue_name = hostcfgd.HANDLER_QUEUES['SSH_SERVER']
+        self.assertEqual(threads, [('hostcfgd-{}'.format(queue_name), queue_name)])
+
+    def test_policies_dispatch_keeps_handler_error(self):
+        MockConfigDb.set_config_db(copy.deepcopy(HOSTCFG_DAEMON_CFG_DB))
+        daemon = hostcfgd.HostConfigDaemon()
+        error = Exception('handler failed')
+        daemon.dispatcher.error = error
+
+        # The failure of another handler is left for the listen loop to raise
+        ran = []
+        daemon.sshscfg.dispatch(lambda: ran.append(True))
+        daemon.dispatcher.join()
+        self.assertEqual(ran, [True])
+        self.assertIs(daemon.dispatcher.error, error)
+
+    @patchfs
+    def test_policies_events(self, fs):
+        self.setup_fs(fs)
+        config_db = copy.deepcopy(HOSTCFG_DAEMON_CFG_DB)
+        config_db['SSH_SERVER'] = {'POLICIES': {'login_timeout': '60', 'authentication_retries': '8'}}
+        MockConfigDb.set_config_db(config_db)
+        MockConfigDb.event_queue = [('SSH_SERVER', 'POLICIES')] * len(POLICIES_BURST)
+
+        daemon = hostcfgd.HostConfigDaemon()
+        daemon.pamLimitsCfg = mock.MagicMock()
+        daemon.register_callbacks()
+        with mock.patch.object(hostcfgd, 'subprocess') as mocked_subprocess, \
+                mock.patch.object(hostcfgd, 'run_cmd') as mocked_run_cmd:
+            mocked_subprocess.run.return_value.returncode = 0
+            daemon.start()
+
+            # Pending policies are applied when the daemon stops
+            mocked_subprocess.run.assert_called_once()
+            mocked_run_cmd.assert_called_once_with(['systemctl', 'restart', 'ssh'], log_err=True, raise_exception=True)
+        self.assertIsNone(daemon.sshscfg.timer)
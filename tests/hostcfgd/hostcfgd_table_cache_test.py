@@ -0,0 +1,146 @@
+import copy
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+from unittest import TestCase, mock
+
+from tests.common.mock_configdb import MockConfigDb, MockDBConnector
+
+test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+sys.path.insert(0, modules_path)
+
+# Load the file under test
+hostcfgd_path = os.path.join(scripts_path, 'hostcfgd')
+loader = importlib.machinery.SourceFileLoader('hostcfgd', hostcfgd_path)
+spec = importlib.util.spec_from_loader(loader.name, loader)
+hostcfgd = importlib.util.module_from_spec(spec)
+loader.exec_module(hostcfgd)
+
+# Mock swsscommon classes
+hostcfgd.ConfigDBConnector = MockConfigDb
+hostcfgd.DBConnector = MockDBConnector
+hostcfgd.Table = mock.Mock()
+
+NUM_SERVERS = 200
+
+CFG_DB = {
+    "DEVICE_METADATA": {
+        "localhost": {"hostname": "sonic", "hwsku": "sku", "type": "ToRRouter"}
+    },
+    "SSH_SERVER": {
+        "POLICIES": {"max_sessions": "10"}
+    },
+    "NTP_KEY": {
+        "1": {"type": "md5", "value": "bXlwYXNzd29yZA==", "trusted": "yes"}
+    },
+    "NTP_SERVER": {},
+    "SYSLOG_CONFIG": {
+        "GLOBAL": {"rate_limit_interval": "30"}
+    },
+    "SYSLOG_SERVER": {},
+    "FIPS": {
+        "global": {"enable": "false", "enforce": "false"}
+    },
+}
+
+
+class TestHostcfgdTableCache(TestCase):
+    """
+        Test hostcfgd handlers reading tables from the subscription maintained cache
+    """
+    def setUp(self):
+        MockConfigDb.set_config_db(copy.deepcopy(CFG_DB))
+        self.get_table = mock.patch.object(MockConfigDb, 'get_table', autospec=True,
+                                           side_effect=MockConfigDb.get_table).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def tearDown(self):
+        MockConfigDb.event_queue = []
+        MockConfigDb.set_config_db({})
+
+    def get_table_count(self, table):
+        return sum(1 for c in self.get_table.call_args_list if c[0][1] == table)
+
+    def run_events(self, daemon, event_queue):
+        MockConfigDb.event_queue = event_queue
+        daemon.register_callbacks()
+        daemon.start()
+
+    def test_table_cache(self):
+        cache = hostcfgd.ConfigTableCache(MockConfigDb())
+        cache.load({"NTP_SERVER": {"10.0.0.1": {}}})
+        cache.update("NTP_SERVER", "10.0.0.2", {"iburst": "on"})
+        cache.update("NTP_SERVER", "10.0.0.1", None)
+        # Tables out of the cache are ignored, they are read when needed
+        cache.update("SYSLOG_SERVER", "10.0.0.5", {})
+        cache.update("LOOPBACK_INTERFACE", "Loopback0|10.1.1.1/32", {})
+
+        servers, syslog_servers = cache.get_tables("NTP_SERVER", "SYSLOG_SERVER")
+        self.assertEqual(servers, {"10.0.0.2": {"iburst": "on"}})
+        self.assertEqual(syslog_servers, {})
+        self.assertEqual(self.get_table_count("NTP_SERVER"), 0)
+        self.assertEqual(self.get_table_count("SYSLOG_SERVER"), 1)
+
+        cache.load({"LOOPBACK_INTERFACE": {}})
+        cache.update("LOOPBACK_INTERFACE", "Loopback0|10.1.1.1/32", {})
+        self.assertEqual(cache.get_table("LOOPBACK_INTERFACE"), {("Loopback0", "10.1.1.1/32"): {}})
+
+        # Handlers get a copy of the table
+        cache.get_table("NTP_SERVER")["10.0.0.2"]["iburst"] = "off"
+        self.assertEqual(cache.get_table("NTP_SERVER"), {"10.0.0.2": {"iburst": "on"}})
+
+    def test_bulk_servers_push(self):
+        daemon = hostcfgd.HostConfigDaemon()
+        daemon.ntpcfg = mock.MagicMock()
+        daemon.rsyslogcfg = mock.MagicMock()
+        daemon.load = mock.Mock()
+
+        servers = {"10.0.{}.{}".format(idx // 256, idx % 256): {"iburst": "on"} for idx in range(NUM_SERVERS)}
+        MockConfigDb.CONFIG_DB["NTP_SERVER"] = copy.deepcopy(servers)
+        MockConfigDb.CONFIG_DB["SYSLOG_SERVER"] = copy.deepcopy(servers)
+        self.run_events(daemon, [(table, server) for server in servers
+                                 for table in ["NTP_SERVER", "SYSLOG_SERVER"]])
+
+        # Every table is read once, whatever the number of events
+        self.assertEqual(self.get_table_count("NTP_SERVER"), 1)
+        self.assertEqual(self.get_table_count("NTP_KEY"), 1)
+        self.assertEqual(self.get_table_count("SYSLOG_SERVER"), 1)
+        self.assertEqual(self.get_table_count("SYSLOG_CONFIG"), 1)
+        self.assertEqual(daemon.ntpcfg.ntp_srv_key_update.call_count, NUM_SERVERS)
+        self.assertEqual(daemon.rsyslogcfg.update_rsyslog_config.call_count, NUM_SERVERS)
+        daemon.ntpcfg.ntp_srv_key_update.assert_called_with(servers, CFG_DB["NTP_KEY"])
+        daemon.rsyslogcfg.update_rsyslog_config.assert_called_with(CFG_DB["SYSLOG_CONFIG"], servers)
+
+        # Deleted entries are removed from the cache
+        del MockConfigDb.CONFIG_DB["NTP_SERVER"]["10.0.0.0"]
+        del servers["10.0.0.0"]
+        daemon.config_db.handlers["NTP_SERVER"]("NTP_SERVER", "10.0.0.0", None)
+        daemon.dispatcher.join()
+        daemon.ntpcfg.ntp_srv_key_update.assert_called_with(servers, CFG_DB["NTP_KEY"])
+        self.assertEqual(self.get_table_count("NTP_SERVER"), 1)
+
+    def test_init_data(self):
+        daemon = hostcfgd.HostConfigDaemon()
+        # PamLimitsCfg read its tables on start
+        self.assertEqual(self.get_table_count("DEVICE_METADATA"), 1)
+        self.assertEqual(self.get_table_count("SSH_SERVER"), 1)
+        daemon.load_config = mock.Mock()
+        daemon.fipscfg = mock.MagicMock()
+        daemon.sshscfg = mock.MagicMock()
+        daemon.pamLimitsCfg.render_conf_file = mock.Mock()
+
+        daemon.load(copy.deepcopy(CFG_DB))
+        MockConfigDb.CONFIG_DB["FIPS"]["global"]["enable"] = "true"
+        MockConfigDb.CONFIG_DB["SSH_SERVER"]["POLICIES"]["max_sessions"] = "20"
+        self.run_events(daemon, [("FIPS", "global"), ("SSH_SERVER", "POLICIES")])
+
+        # Tables of the initial config are never read again
+        self.assertEqual(self.get_table_count("FIPS"), 0)
+        self.assertEqual(self.get_table_count("SSH_SERVER"), 1)
+        daemon.fipscfg.fips_handler.assert_called_once_with({"global": {"enable": "true", "enforce": "false"}})
+        self.assertEqual(daemon.pamLimitsCfg.max_sessions, "20")
+        daemon.pamLimitsCfg.render_conf_file.assert_called_once_with()
@@ -224,6 +224,8 @@ class TestHostcfgdTACACS(TestCase):
                 host_config_daemon.__dict__['config_db'].publish('AAA', 'authorization', 'DEL', None)
             except TypeError as e:
                 assert False
+            # handlers run in worker threads
+            host_config_daemon.dispatcher.join()
 
             # check sys log
             expected = [
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+    hostcfgd template rendering benchmark
+
+    Renders every template of data/templates with a representative context and
+    measures the rendering throughput:
+      - as hostcfgd used to render them, with a new Jinja2 environment, and so a
+        new compilation of the template, for every rendering
+      - with the Jinja2 environment hostcfgd shares between renderings
+
+    Results are emitted as JSON so that they can be compared across commits.
+    Run it from the repository root, e.g.:
+
+        python3 -m tests.hostcfgd.hostcfgd_template_benchmark --renders 1000 --output hostcfgd_template_benchmark.json
+"""
+
+import argparse
+import importlib.machinery
+import importlib.util
+import os
+import sys
+import time
+
+import jinja2
+
+from tests.common.benchmark import benchmark_main
+
+test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+templates_path = os.path.join(modules_path, "data/templates")
+
+DEFAULT_RENDERS = 200
+DEFAULT_SERVERS = 8
+
+
+def load_hostcfgd():
+    sys.path.insert(0, modules_path)
+    hostcfgd_path = os.path.join(scripts_path, 'hostcfgd')
+    loader = importlib.machinery.SourceFileLoader('hostcfgd', hostcfgd_path)
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    hostcfgd = importlib.util.module_from_spec(spec)
+    loader.exec_module(hostcfgd)
+    return hostcfgd
+
+
+def generate_context(hostcfgd, num_servers):
+    """
+    Generate a context holding the variables used by the hostcfgd templates,
+    with num_servers AAA servers.
+    """
+    servers = []
+    for idx in range(num_servers):
+        servers.append({
+            'ip': '10.0.0.{}'.format(idx + 1),
+            'priority': num_servers - idx,
+            'tcp_port': '49',
+            'auth_port': '1812',
+            'timeout': '5',
+            'retransmit': '3',
+            'passkey': 'passkey{}'.format(idx),
+            'auth_type': 'pap',
+            'vrf': 'mgmt',
+        })
+
+    return {
+        'debug': False,
+        'trace': False,
+        'auth': {'login': 'tacacs+,local', 'failthrough': True},
+        'src_ip': '10.1.0.32',
+        'servers': servers,
+        'server': servers[0],
+        'local_accounting': 'on',
+        'tacacs_accounting': 'on',
+        'local_authorization': 'on',
+        'tacacs_authorization': 'on',
+        'passw_policies': {'state': 'enabled', 'len_min': '8', 'upper_class': True, 'lower_class': True,
+                           'digits_class': True, 'special_class': True, 'reject_user_passw_match': True,
+                           'history_cnt': '10'},
+        'ldap_cfg': hostcfgd.ldap.LdapCfg,
+        'hwsku': 'Force10-S6000',
+        'type': 'ToRRouter',
+        'max_sessions': 10,
+    }
+
+
+def render_with_new_env(hostcfgd, template_j2, context):
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader('/'), trim_blocks=True)
+    env.filters['sub'] = hostcfgd.sub
+    return env.get_template(os.path.abspath(template_j2)).render(**context)
+
+
+def render_with_shared_env(hostcfgd, template_j2, context):
+    return hostcfgd.get_template(template_j2).render(**context)
+
+
+def measure_renders(render, hostcfgd, templates, context, num_renders):
+    start = time.perf_counter()
+    for _ in range(num_renders):
+        for template_j2 in templates:
+            render(hostcfgd, template_j2, context)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "time_secs": elapsed,
+        "renders_per_sec": num_renders * len(templates) / elapsed,
+    }
+
+
+def run(args):
+    hostcfgd = load_hostcfgd()
+    context = generate_context(hostcfgd, args.servers)
+    templates = sorted(os.path.join(templates_path, name) for name in os.listdir(templates_path) if name.endswith(".j2"))
+
+    # Renderings have to be identical either way
+    for template_j2 in templates:
+        assert render_with_new_env(hostcfgd, template_j2, context) == render_with_shared_env(hostcfgd, template_j2, context)
+
+    results = {
+        "benchmark": "hostcfgd_template",
+        "templates": [os.path.basename(template_j2) for template_j2 in templates],
+        "renders": args.renders,
+        "servers": args.servers,
+        "new_env": measure_renders(render_with_new_env, hostcfgd, templates, context, args.renders),
+        "shared_env": measure_renders(render_with_shared_env, hostcfgd, templates, context, args.renders),
+    }
+    results["speedup"] = results["shared_env"]["renders_per_sec"] / results["new_env"]["renders_per_sec"]
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark hostcfgd template rendering")
+    parser.add_argument("--renders", type=int, default=DEFAULT_RENDERS,
+                        help="Number of renderings of every template")
+    parser.add_argument("--servers", type=int, default=DEFAULT_SERVERS,
+                        help="Number of AAA servers in the rendering context")
+    return benchmark_main(parser, run, argv)
+
+
+if __name__ == "__main__":
+    main()
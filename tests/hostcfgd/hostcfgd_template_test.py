@@ -0,0 +1,74 @@
+import importlib.machinery
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+
+from unittest import TestCase
+
+from . import hostcfgd_template_benchmark
+
+test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+sys.path.insert(0, modules_path)
+
+# Load the file under test
+hostcfgd_path = os.path.join(scripts_path, 'hostcfgd')
+loader = importlib.machinery.SourceFileLoader('hostcfgd', hostcfgd_path)
+spec = importlib.util.spec_from_loader(loader.name, loader)
+hostcfgd = importlib.util.module_from_spec(spec)
+loader.exec_module(hostcfgd)
+
+
+class TestHostcfgdTemplate(TestCase):
+    """
+        Test hostcfgd template rendering
+    """
+    def test_template_is_compiled_once(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            template_j2 = os.path.join(tmpdir, "test.conf.j2")
+            with open(template_j2, 'w') as f:
+                f.write("{{ servers | sub(0, 1) | join(',') }}\n")
+
+            template = hostcfgd.get_template(template_j2)
+            self.assertIs(hostcfgd.get_template(template_j2), template)
+            self.assertEqual(template.render(servers=['a', 'b']), "a")
+
+    def test_template_is_recompiled_when_modified(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            template_j2 = os.path.join(tmpdir, "test.conf.j2")
+            with open(template_j2, 'w') as f:
+                f.write("old {{ value }}\n")
+            self.assertEqual(hostcfgd.get_template(template_j2).render(value=1), "old 1")
+
+            with open(template_j2, 'w') as f:
+                f.write("new {{ value }}\n")
+            mtime = os.path.getmtime(template_j2) + 1
+            os.utime(template_j2, (mtime, mtime))
+            self.assertEqual(hostcfgd.get_template(template_j2).render(value=1), "new 1")
+
+    def test_generate_file_from_template(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            template_j2 = os.path.join(tmpdir, "test.conf.j2")
+            file_conf_output = os.path.join(tmpdir, "test.conf")
+            with open(template_j2, 'w') as f:
+                f.write("{% for server in servers %}server {{ server }}\n{% endfor %}")
+
+            for servers in [['10.0.0.1'], ['10.0.0.1', '10.0.0.2']]:
+                hostcfgd.generate_file_from_template(template_j2, file_conf_output, 0o640, {'servers': servers})
+                with open(file_conf_output) as f:
+                    self.assertEqual(f.read(), ''.join("server {}\n".format(server) for server in servers))
+            self.assertEqual(os.stat(file_conf_output).st_mode & 0o777, 0o640)
+
+    def test_hostcfgd_template_benchmark(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = os.path.join(tmpdir, "hostcfgd_template_benchmark.json")
+            hostcfgd_template_benchmark.main(["--renders", "2", "--servers", "2", "--output", output])
+            with open(output) as f:
+                results = json.load(f)
+
+        self.assertIn("common-auth-sonic.j2", results["templates"])
+        self.assertGreater(results["new_env"]["renders_per_sec"], 0)
+        self.assertGreater(results["shared_env"]["renders_per_sec"], 0)
@@ -213,13 +213,14 @@ class TestHostcfgdDaemon(TestCase):
                 pass
             expected = [
                 call(['sonic-kdump-config', '--disable']),
-                call(['sonic-kdump-config', '--num_dumps', '3']),
                 call(['sonic-kdump-config', '--memory', '0M-2G:256M,2G-4G:320M,4G-8G:384M,8G-16G:448M,16G-32G:768M,32G-:1G']),
-                call(['sonic-kdump-config', '--remote']),  # Covering remote
+                call(['sonic-kdump-config', '--num_dumps', '3']),
                 call(['sonic-kdump-config', '--ssh_string', 'user@localhost']),  # Covering ssh_string
-                call(['sonic-kdump-config', '--ssh_path', '/a/b/c'])  # Covering ssh_path
+                call(['sonic-kdump-config', '--ssh_path', '/a/b/c']),  # Covering ssh_path
+                call(['sonic-kdump-config', '--remote'])  # Covering remote
             ]
-            mocked_subprocess.check_call.assert_has_calls(expected, any_order=True)
+            # One invocation per option, each option being applied once
+            self.assertEqual(mocked_subprocess.check_call.call_args_list, expected)
 
     def test_kdump_load(self):
         MockConfigDb.set_config_db(HOSTCFG_DAEMON_INIT_CFG_DB)
@@ -234,24 +235,24 @@ class TestHostcfgdDaemon(TestCase):
 
             expected = [
                 call(['sonic-kdump-config', '--enable']),
-                call(['sonic-kdump-config', '--num_dumps', '3']),
                 call(['sonic-kdump-config', '--memory', '0M-2G:256M,2G-4G:320M,4G-8G:384M,8G-16G:448M,16G-32G:768M,32G-:1G']),
-                call(['sonic-kdump-config', '--remote']),  # Covering remote
+                call(['sonic-kdump-config', '--num_dumps', '3']),
                 call(['sonic-kdump-config', '--ssh_string', 'user@localhost']),  # Covering ssh_string
-                call(['sonic-kdump-config', '--ssh_path', '/a/b/c'])  # Covering ssh_path
+                call(['sonic-kdump-config', '--ssh_path', '/a/b/c']),  # Covering ssh_path
+                call(['sonic-kdump-config', '--remote'])  # Covering remote
             ]
-
-            mocked_subprocess.check_call.assert_has_calls(expected, any_order=True)
+            # One invocation per option, each option being applied once
+            self.assertEqual(mocked_subprocess.check_call.call_args_list, expected)
 
     def test_kdump_event_with_proc_cmdline(self):
         os.environ["HOSTCFGD_UNIT_TESTING"] = "2"
         MockConfigDb.set_config_db(HOSTCFG_DAEMON_CFG_DB)
         daemon = hostcfgd.HostConfigDaemon()
         default=daemon.kdumpCfg.kdump_defaults
-        daemon.kdumpCfg.load(default)
         daemon.register_callbacks()
         MockConfigDb.event_queue = [('KDUMP', 'config')]
         with mock.patch('hostcfgd.subprocess') as mocked_subprocess:
+            daemon.kdumpCfg.load(default)
             popen_mock = mock.Mock()
             attrs = {'communicate.return_value': ('output', 'error')}
             popen_mock.configure_mock(**attrs)
@@ -262,15 +263,44 @@ class TestHostcfgdDaemon(TestCase):
                 pass
             expected = [
                 call(['sonic-kdump-config', '--enable']),
-                call(['sonic-kdump-config', '--num_dumps', '3']),
                 call(['sonic-kdump-config', '--memory', '8G-:1G']),
-                call(['sonic-kdump-config', '--remote']),  # Covering remote
+                call(['sonic-kdump-config', '--num_dumps', '3']),
                 call(['sonic-kdump-config', '--ssh_string', 'user@localhost']),  # Covering ssh_string
-                call(['sonic-kdump-config', '--ssh_path', '/a/b/c'])  # Covering ssh_path
+                call(['sonic-kdump-config', '--ssh_path', '/a/b/c']),  # Covering ssh_path
+                call(['sonic-kdump-config', '--remote'])  # Covering remote
             ]
-            mocked_subprocess.check_call.assert_has_calls(expected, any_order=True)
+            # One invocation per option, each option being applied once
+            self.assertEqual(mocked_subprocess.check_call.call_args_list, expected)
         os.environ["HOSTCFGD_UNIT_TESTING"] = ""
-        
+
+    def test_kdump_update_changed_fields(self):
+        MockConfigDb.set_config_db(HOSTCFG_DAEMON_INIT_CFG_DB)
+        kdumpcfg = hostcfgd.KdumpCfg(MockConfigDb())
+        config = dict(kdumpcfg.kdump_defaults, enabled='true')
+        def check_call(cmd):
+            if '--num_dumps' in cmd:
+                raise CalledProcessError(1, cmd)
+
+        with mock.patch('hostcfgd.subprocess') as mocked_subprocess:
+            # Only the failed option is applied again
+            mocked_subprocess.check_call.side_effect = check_call
+            kdumpcfg.kdump_update('config', config)
+            self.assertEqual(mocked_subprocess.check_call.call_count, 6)
+            mocked_subprocess.check_call.reset_mock(side_effect=True)
+            kdumpcfg.kdump_update('config', config)
+            mocked_subprocess.check_call.assert_called_once_with(['sonic-kdump-config', '--num_dumps', '3'])
+
+            # Only the changed options are applied
+            mocked_subprocess.check_call.reset_mock()
+            kdumpcfg.kdump_update('config', config)
+            mocked_subprocess.check_call.assert_not_called()
+            kdumpcfg.kdump_update('config', dict(config, num_dumps='5', ssh_path='/x'))
+            self.assertEqual(mocked_subprocess.check_call.call_args_list, [
+                call(['sonic-kdump-config', '--num_dumps', '5']),
+                call(['sonic-kdump-config', '--ssh_path', '/x']),
+                call(['sonic-kdump-config', '--remote']),
+            ])
+
     def test_devicemeta_event(self):
         """
         Test handling DEVICE_METADATA events.
@@ -403,14 +433,17 @@ class TestHostcfgdDaemon(TestCase):
                 except TimeoutError:
                     pass
 
+                # The mgmt VRF change restarts interfaces-config, so the
+                # restart pending for the interface change is dropped
                 expected = [
-                    call(['sudo', 'systemctl', 'restart', 'interfaces-config']),
                     call(['systemctl', 'stop', 'chrony']),
                     call(['systemctl', 'restart', 'interfaces-config']),
                     call(['systemctl', 'start', 'chrony']),
                     call(['ip', '-4', 'route', 'del', 'default', 'dev', 'eth0', 'metric', '202'])
                 ]
                 mocked_subprocess.check_call.assert_has_calls(expected)
+                self.assertNotIn(call(['sudo', 'systemctl', 'restart', 'interfaces-config']),
+                                 mocked_subprocess.check_call.call_args_list)
                 expected = [
                     call(['cat', '/proc/net/route'], ['grep', '-E', r"eth0\s+00000000\s+[0-9A-Z]+\s+[0-9]+\s+[0-9]+\s+[0-9]+\s+202"], ['wc', '-l'])
                 ]
@@ -449,7 +482,7 @@ class TestHostcfgdDaemon(TestCase):
                 daemon.start()
             except TimeoutError:
                 pass
-            mocked_run_cmd.assert_has_calls([call(['systemctl', 'restart', 'resolv-config'], True, False)])
+            mocked_run_cmd.assert_has_calls([call(['systemctl', 'restart', 'resolv-config'], True, True)])
 
     def test_dns_options_events(self):
         MockConfigDb.set_config_db(HOSTCFG_DAEMON_CFG_DB)
@@ -461,7 +494,7 @@ class TestHostcfgdDaemon(TestCase):
                 daemon.start()
             except TimeoutError:
                 pass
-            mocked_run_cmd.assert_has_calls([call(['systemctl', 'restart', 'resolv-config'], True, False)])
+            mocked_run_cmd.assert_has_calls([call(['systemctl', 'restart', 'resolv-config'], True, True)])
 
 class TestRunCmd:
     """Tests for the run_cmd family error handling.
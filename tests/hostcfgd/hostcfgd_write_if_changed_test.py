@@ -0,0 +1,166 @@
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+from unittest import TestCase, mock
+from pyfakefs.fake_filesystem_unittest import patchfs
+
+from tests.common.mock_configdb import MockConfigDb, MockDBConnector
+
+test_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+modules_path = os.path.dirname(test_path)
+scripts_path = os.path.join(modules_path, "scripts")
+templates_path = os.path.join(modules_path, "data/templates")
+sys.path.insert(0, modules_path)
+
+# Load the file under test
+hostcfgd_path = os.path.join(scripts_path, 'hostcfgd')
+loader = importlib.machinery.SourceFileLoader('hostcfgd', hostcfgd_path)
+spec = importlib.util.spec_from_loader(loader.name, loader)
+hostcfgd = importlib.util.module_from_spec(spec)
+loader.exec_module(hostcfgd)
+
+# Mock swsscommon classes
+hostcfgd.ConfigDBConnector = MockConfigDb
+hostcfgd.DBConnector = MockDBConnector
+hostcfgd.Table = mock.Mock()
+
+SSHD_CONFIG = "Port 22\nPermitRootLogin yes\nPasswordAuthentication yes\n"
+
+
+class TestHostcfgdWriteIfChanged(TestCase):
+    """
+        Test hostcfgd skipping writes and restarts when generated files are unchanged
+    """
+    def setUp(self):
+        # pyfakefs only patches modules registered in sys.modules
+        self.saved_hostcfgd = sys.modules.get('hostcfgd')
+        sys.modules['hostcfgd'] = hostcfgd
+
+    def tearDown(self):
+        if self.saved_hostcfgd is None:
+            del sys.modules['hostcfgd']
+        else:
+            sys.modules['hostcfgd'] = self.saved_hostcfgd
+
+    def setup_fs(self, fs):
+        fs.add_real_directory(templates_path, target_path=os.path.dirname(hostcfgd.PAM_AUTH_CONF_TEMPLATE))
+        for filename in [hostcfgd.PAM_AUTH_CONF, hostcfgd.LDAP_CONF, hostcfgd.LIMITS_CONF]:
+            fs.create_dir(os.path.dirname(filename))
+
+    @patchfs
+    def test_write_file_if_changed(self, fs):
+        filename = "/etc/test.conf"
+        fs.create_dir("/etc")
+
+        self.assertTrue(hostcfgd.write_file_if_changed(filename, "a\n", 0o640))
+        inode = os.stat(filename).st_ino
+
+        self.assertFalse(hostcfgd.write_file_if_changed(filename, "a\n", 0o640))
+        self.assertEqual(os.stat(filename).st_ino, inode)
+
+        # The mode is fixed in place for unchanged content
+        self.assertFalse(hostcfgd.write_file_if_changed(filename, "a\n", 0o600))
+        self.assertEqual(os.stat(filename).st_mode & 0o777, 0o600)
+        self.assertEqual(os.stat(filename).st_ino, inode)
+
+        # Changed content replaces the file and keeps its mode by default
+        self.assertTrue(hostcfgd.write_file_if_changed(filename, "b\n"))
+        self.assertNotEqual(os.stat(filename).st_ino, inode)
+        self.assertEqual(os.stat(filename).st_mode & 0o777, 0o600)
+        with open(filename) as f:
+            self.assertEqual(f.read(), "b\n")
+        self.assertFalse(os.path.exists(filename + ".tmp"))
+
+    @patchfs
+    def test_write_file_if_changed_permission(self, fs):
+        filename = "/etc/secret.conf"
+        # Left over by an interrupted write
+        fs.create_file(filename + ".tmp", contents="old secret\n", st_mode=0o100644)
+
+        fchmod = hostcfgd.os.fchmod
+        sizes = []
+
+        def record_fchmod(fd, mode):
+            sizes.append(os.fstat(fd).st_size)
+            fchmod(fd, mode)
+
+        with mock.patch.object(hostcfgd.os, 'fchmod', side_effect=record_fchmod):
+            self.assertTrue(hostcfgd.write_file_if_changed(filename, "secret\n", 0o600))
+        # The mode is set before the content is written
+        self.assertEqual(sizes, [0])
+        self.assertEqual(os.stat(filename).st_mode & 0o777, 0o600)
+        self.assertFalse(os.path.exists(filename + ".tmp"))
+
+        # The temporary file is removed on error
+        with mock.patch.object(hostcfgd.os, 'rename', side_effect=OSError("rename failed")):
+            with self.assertRaises(OSError):
+                hostcfgd.write_file_if_changed(filename, "new secret\n", 0o600)
+        self.assertFalse(os.path.exists(filename + ".tmp"))
+        with open(filename) as f:
+            self.assertEqual(f.read(), "secret\n")
+
+    @patchfs
+    def test_aaa_identical_update(self, fs):
+        self.setup_fs(fs)
+        MockConfigDb.set_config_db({})
+        aaacfg = hostcfgd.AaaCfg(MockConfigDb())
+        tacacs_server = {'priority': '1', 'tcp_port': '49', 'timeout': '10'}
+
+        with mock.patch.object(hostcfgd, 'subprocess') as mocked_subprocess, \
+                mock.patch.object(hostcfgd, 'handle_nslcd_service') as mocked_handle_nslcd_service, \
+                mock.patch.object(aaacfg, 'notify_audisp_tacplus_reload_config') as mocked_notify:
+            aaacfg.aaa_update('authentication', {'login': 'tacacs+'})
+            aaacfg.tacacs_server_update('10.0.0.1', dict(tacacs_server))
+            mocked_notify.assert_called()
+            mocked_handle_nslcd_service.assert_called_once()
+            written = {filename: os.stat(filename).st_ino for filename in
+                       [hostcfgd.PAM_AUTH_CONF, hostcfgd.NSS_TACPLUS_CONF, hostcfgd.NSS_RADIUS_CONF,
+                        hostcfgd.NSLCD_CONF, hostcfgd.LDAP_CONF]}
+
+            # Redundant updates neither rewrite the files nor notify or restart services
+            mocked_notify.reset_mock()
+            mocked_handle_nslcd_service.reset_mock()
+            aaacfg.aaa_update('authentication', {'login': 'tacacs+'})
+            aaacfg.tacacs_server_update('10.0.0.1', dict(tacacs_server))
+            aaacfg.ldap_server_update('10.0.0.2', {})
+            mocked_notify.assert_not_called()
+            mocked_handle_nslcd_service.assert_not_called()
+            for filename, inode in written.items():
+                self.assertEqual(os.stat(filename).st_ino, inode, filename)
+
+            # Actual changes are still applied
+            aaacfg.tacacs_server_update('10.0.0.1', dict(tacacs_server, timeout='5'))
+            mocked_notify.assert_called_once()
+            self.assertNotEqual(os.stat(hostcfgd.NSS_TACPLUS_CONF).st_ino, written[hostcfgd.NSS_TACPLUS_CONF])
+
+    @patchfs
+    def test_pam_limits_identical_update(self, fs):
+        self.setup_fs(fs)
+        MockConfigDb.set_config_db({'DEVICE_METADATA': {'localhost': {'hwsku': 'Force10-S6000', 'type': 'ToRRouter'}},
+                                    'SSH_SERVER': {'POLICIES': {'max_sessions': '10'}}})
+        pamLimitsCfg = hostcfgd.PamLimitsCfg(MockConfigDb())
+
+        pamLimitsCfg.update_config_file()
+        written = {filename: os.stat(filename).st_ino for filename in [hostcfgd.PAM_LIMITS_CONF, hostcfgd.LIMITS_CONF]}
+
+        pamLimitsCfg.update_config_file()
+        for filename, inode in written.items():
+            self.assertEqual(os.stat(filename).st_ino, inode, filename)
+
+    @patchfs
+    def test_ssh_server_identical_update(self, fs):
+        fs.create_file(hostcfgd.SSH_CONFG, contents=SSHD_CONFIG)
+        inode = os.stat(hostcfgd.SSH_CONFG).st_ino
+        sshscfg = hostcfgd.SshServer()
+
+        with mock.patch.object(hostcfgd, 'subprocess') as mocked_subprocess, \
+                mock.patch.object(hostcfgd, 'run_cmd') as mocked_run_cmd:
+            sshscfg.policies_update('POLICIES', {'max_sessions': '10'})
+            sshscfg.flush()
+            mocked_subprocess.run.assert_not_called()
+            mocked_run_cmd.assert_not_called()
+
+        self.assertEqual(os.stat(hostcfgd.SSH_CONFG).st_ino, inode)
+        self.assertFalse(os.path.exists(hostcfgd.SSH_CONFG_TMP))